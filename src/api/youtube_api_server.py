@@ -41,9 +41,22 @@ logger.info(f"Static directory: {static_dir}")
 logger.info(f"Template directory exists: {template_dir.exists()}")
 logger.info(f"Static directory exists: {static_dir.exists()}")
 
-# Initialize DynamoDB client
+# Initialize DynamoDB client (search goes through OpenSearch when OPENSEARCH_URL is set)
 table_name = os.getenv("YOUTUBE_DYNAMODB_TABLE", "youtube_videos")
-dynamodb_client = YouTubeDynamoDBClient(table_name)
+search_index = None
+if os.getenv("OPENSEARCH_URL"):
+    from services.database.youtube_search_index import (
+        DEFAULT_INDEX_NAME,
+        YouTubeSearchIndex,
+    )
+
+    search_index = YouTubeSearchIndex(
+        os.getenv("OPENSEARCH_URL"), os.getenv("OPENSEARCH_INDEX", DEFAULT_INDEX_NAME)
+    )
+    # Create the index with its mapping before the sync Lambda can auto-create it
+    search_index.ensure_index()
+    logger.info(f"OpenSearch search index configured: {search_index.index_name}")
+dynamodb_client = YouTubeDynamoDBClient(table_name, search_index=search_index)
 
 # Initialize S3 client for transcription text files
 s3_bucket_name = os.getenv("S3_BUCKET_NAME")
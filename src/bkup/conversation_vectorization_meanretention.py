@@ -1,12 +1,16 @@
 import os
+import re
 import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import cached_property
 from datetime import datetime
-from typing import List, Dict, Any
-from dataclasses import dataclass
+from typing import List, Dict, Any, Union
+from dataclasses import dataclass, field
 
 # Required libraries
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from sentence_transformers import SentenceTransformer
+import torch
 from pymilvus import connections, Collection, FieldSchema, CollectionSchema, DataType
 import numpy as np
 
@@ -16,6 +20,25 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Zero-width split point after each Japanese sentence terminator
+_SENT_RE = re.compile(r"(?<=[。！？])")
+
+# Candidate chunk boundaries (a chunk may end right after any of these)
+_CHUNK_SEP_RE = re.compile(r"[\n。！？ ]")
+
+# Rows per collection.insert call (keeps requests under Milvus size limits)
+INSERT_BATCH_SIZE = 5000
+
+# Concurrent S3 downloads feeding the encoder in main()
+S3_FETCH_WORKERS = 16
+
+# Texts per forward pass in generate_embeddings
+ENCODE_BATCH_SIZE = 64
+
+# Collections up to this many rows use brute-force FLAT instead of HNSW; a
+# reused FLAT collection is rebuilt as HNSW once it grows past this
+FLAT_INDEX_MAX_ROWS = 1000
+
 
 @dataclass
 class ConversationChunk:
@@ -29,6 +52,68 @@ class ConversationChunk:
     original_length: int
 
 
+@dataclass
+class ChunkBatch:
+    """Column-oriented (SoA) storage for conversation chunks"""
+
+    ids: List[str] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list)
+    speakers: List[str] = field(default_factory=list)
+    timestamps: List[str] = field(default_factory=list)
+    chunk_indices: np.ndarray = field(
+        default_factory=lambda: np.empty(0, dtype=np.int64)
+    )
+    original_lengths: np.ndarray = field(
+        default_factory=lambda: np.empty(0, dtype=np.int64)
+    )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_chunks(cls, chunks: List[ConversationChunk]) -> "ChunkBatch":
+        """Transpose ConversationChunk rows into columns in a single pass"""
+        n = len(chunks)
+        ids, texts, speakers, timestamps = (
+            [None] * n,
+            [None] * n,
+            [None] * n,
+            [None] * n,
+        )
+        for i, chunk in enumerate(chunks):
+            ids[i] = chunk.id
+            texts[i] = chunk.text
+            speakers[i] = chunk.speaker
+            timestamps[i] = chunk.timestamp
+        return cls(
+            ids=ids,
+            texts=texts,
+            speakers=speakers,
+            timestamps=timestamps,
+            # Fill int64 columns without boxing into intermediate lists
+            chunk_indices=np.fromiter(
+                (chunk.chunk_index for chunk in chunks), dtype=np.int64, count=n
+            ),
+            original_lengths=np.fromiter(
+                (chunk.original_length for chunk in chunks), dtype=np.int64, count=n
+            ),
+        )
+
+    @classmethod
+    def concat(cls, batches: List["ChunkBatch"]) -> "ChunkBatch":
+        """Concatenate several batches column by column"""
+        if not batches:
+            return cls()
+        return cls(
+            ids=[x for b in batches for x in b.ids],
+            texts=[x for b in batches for x in b.texts],
+            speakers=[x for b in batches for x in b.speakers],
+            timestamps=[x for b in batches for x in b.timestamps],
+            chunk_indices=np.concatenate([b.chunk_indices for b in batches]),
+            original_lengths=np.concatenate([b.original_lengths for b in batches]),
+        )
+
+
 class ConversationVectorizer:
 
     def __init__(
@@ -36,6 +121,13 @@ class ConversationVectorizer:
         zilliz_uri: str,
         zilliz_token: str,
         embedding_model: str = "sonoisa/sentence-bert-base-ja-mean-tokens-v2",
+        use_fp16: bool = True,
+        backend: str = "torch",
+        onnx_file_name: str = None,
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 200,
+        search_ef: int = 64,
+        recreate: bool = False,
     ):
         """
         Initialization
@@ -43,21 +135,80 @@ class ConversationVectorizer:
             zilliz_uri: Zilliz Cloud URI
             zilliz_token: Zilliz Cloud token
             embedding_model: Embedding model to use
+            use_fp16: Run the embedding model in FP16 when a GPU is available
+            backend: Inference backend ("torch" or "onnx")
+            onnx_file_name: ONNX file to load with the onnx backend, e.g. a
+                quantized "onnx/model_qint8_avx512_vnni.onnx"
+            hnsw_m: HNSW graph degree (M)
+            hnsw_ef_construction: HNSW build-time candidate list size
+            search_ef: HNSW search-time candidate list size
+            recreate: Drop and recreate the collection if it already exists
         """
         self.zilliz_uri = zilliz_uri
         self.zilliz_token = zilliz_token
-        self.embedding_model = SentenceTransformer(embedding_model)
+        self.embedding_model_name = embedding_model
+        self.use_fp16 = use_fp16
+        self.backend = backend
+        self.onnx_file_name = onnx_file_name
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.collection_name = "conversation_chunks"
-
-        # Initialize text splitter
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=300,  # Chunk size
-            chunk_overlap=50,  # Overlap
-            separators=["\n\n", "\n", "。", "！", "？", " ", ""],
-        )
-
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.search_ef = search_ef
+        self.recreate = recreate
+
+        # Text splitting parameters
+        self.chunk_size = 300  # Chunk size
+        self.chunk_overlap = 50  # Overlap
+
+        # Chunks/embeddings queued by process_monologue until finalize()
+        self._pending_chunks: List[ChunkBatch] = []
+        self._pending_embeddings: List[np.ndarray] = []
+        self._pending_rows = 0
+        # Outstanding asynchronous inserts (pymilvus MutationFuture)
+        self._insert_futures = []
+        # Index type of the embedding field, see _embedding_index_type()
+        self._index_type = None
+
+        # The embedding model and the Zilliz collection are loaded lazily on
+        # first use (see the cached properties below)
+
+    @cached_property
+    def embedding_model(self) -> SentenceTransformer:
+        """SentenceTransformer model, loaded on first access"""
+        # Encode on GPU when available (FP16 halves memory bandwidth)
+        if self.backend == "onnx":
+            # ONNX Runtime session (exported on first load if needed)
+            model_kwargs = {
+                "provider": (
+                    "CUDAExecutionProvider"
+                    if self.device == "cuda"
+                    else "CPUExecutionProvider"
+                )
+            }
+            if self.onnx_file_name:
+                model_kwargs["file_name"] = self.onnx_file_name
+            model = SentenceTransformer(
+                self.embedding_model_name,
+                device=self.device,
+                backend="onnx",
+                model_kwargs=model_kwargs,
+            )
+        else:
+            model = SentenceTransformer(self.embedding_model_name, device=self.device)
+            if self.device == "cuda" and self.use_fp16:
+                model = model.half()
+            elif self.device == "cpu":
+                # CPU fallback: use all available cores for the forward pass
+                torch.set_num_threads(os.cpu_count() or 1)
+        print(f"✅ Loaded embedding model on {self.device}")
+        return model
+
+    @cached_property
+    def collection(self) -> Collection:
+        """Zilliz collection, connected and set up on first access"""
         self._connect_to_zilliz()
-        self._setup_collection()
+        return self._setup_collection()
 
     def _connect_to_zilliz(self):
         """Connect to Zilliz Cloud"""
@@ -70,8 +221,17 @@ class ConversationVectorizer:
             print(f"❌ Zilliz Cloud connection error: {e}")
             raise
 
-    def _setup_collection(self):
-        """Set up collection"""
+    def _setup_collection(self) -> Collection:
+        """Set up collection (reuse an existing one unless recreate is set)"""
+        from pymilvus import utility
+
+        if utility.has_collection(self.collection_name) and not self.recreate:
+            collection = Collection(self.collection_name)
+            if collection.has_index():
+                collection.load()
+            print(f"✅ Using existing collection '{self.collection_name}'")
+            return collection
+
         # Define field schema
         fields = [
             FieldSchema(
@@ -91,13 +251,18 @@ class ConversationVectorizer:
 
         # Create collection (drop if exists)
         try:
-            from pymilvus import utility
-
             if utility.has_collection(self.collection_name):
                 utility.drop_collection(self.collection_name)
 
-            self.collection = Collection(self.collection_name, schema)
+            # Single shard and eventual consistency keep inserts cheap
+            collection = Collection(
+                self.collection_name,
+                schema,
+                num_shards=1,
+                consistency_level="Eventually",
+            )
             print(f"✅ Created collection '{self.collection_name}'")
+            return collection
         except Exception as e:
             print(f"❌ Collection creation error: {e}")
             raise
@@ -110,150 +275,317 @@ class ConversationVectorizer:
         Returns:
             List of parsed content
         """
-        utterances = []
+        # All utterances of one parse share the same timestamp
+        now = datetime.now().isoformat()
 
         # Process by paragraphs if separated by line breaks
         if "\n" in text:
-            paragraphs = [p.strip() for p in text.split("\n") if p.strip()]
-            for i, paragraph in enumerate(paragraphs):
-                utterances.append(
-                    {
-                        "speaker": "Speaker",
-                        "content": paragraph,
-                        "timestamp": datetime.now().isoformat(),
-                        "paragraph_index": i,
-                    }
-                )
+            paragraphs = [p for p in map(str.strip, text.split("\n")) if p]
+            utterances = [
+                {
+                    "speaker": "Speaker",
+                    "content": paragraph,
+                    "timestamp": now,
+                    "paragraph_index": i,
+                }
+                for i, paragraph in enumerate(paragraphs)
+            ]
         else:
             # Split by sentence endings if no line breaks
-            sentences = []
-            current_sentence = ""
-
-            for char in text:
-                current_sentence += char
-                if char in ["。", "！", "？"]:
-                    if current_sentence.strip():
-                        sentences.append(current_sentence.strip())
-                        current_sentence = ""
-
-            # Handle last sentence if it doesn't end with punctuation
-            if current_sentence.strip():
-                sentences.append(current_sentence.strip())
-
-            for i, sentence in enumerate(sentences):
-                utterances.append(
-                    {
-                        "speaker": "Speaker",
-                        "content": sentence,
-                        "timestamp": datetime.now().isoformat(),
-                        "sentence_index": i,
-                    }
-                )
+            # (the last sentence may not end with punctuation)
+            sentences = [s for s in map(str.strip, _SENT_RE.split(text)) if s]
+            utterances = [
+                {
+                    "speaker": "Speaker",
+                    "content": sentence,
+                    "timestamp": now,
+                    "sentence_index": i,
+                }
+                for i, sentence in enumerate(sentences)
+            ]
 
         return utterances
 
     def chunk_conversations(
-        self, utterances: List[Dict[str, Any]]
-    ) -> List[ConversationChunk]:
+        self, utterances: List[Dict[str, Any]], source: str = ""
+    ) -> ChunkBatch:
         """
         Split utterances into chunks
         Args:
             utterances: List of utterances
+            source: Source file key; chunk ids are derived from it so they are
+                unique across files and stable across runs
         Returns:
-            List of chunks
+            Column-oriented batch of chunks
         """
-        chunks = []
-        chunk_id = 0
-
-        for utterance in utterances:
-            content = utterance["content"]
-
-            # Split long utterances
-            if len(content) > 300:
-                text_chunks = self.text_splitter.split_text(content)
-                for i, chunk_text in enumerate(text_chunks):
-                    chunks.append(
-                        ConversationChunk(
-                            id=f"chunk_{chunk_id:06d}",
-                            text=chunk_text,
-                            speaker=utterance["speaker"],
-                            timestamp=utterance["timestamp"],
-                            chunk_index=i,
-                            original_length=len(content),
-                        )
-                    )
-                    chunk_id += 1
+        n = len(utterances)
+        contents = [utterance["content"] for utterance in utterances]
+        lengths = np.fromiter(map(len, contents), dtype=np.int64, count=n)
+
+        # Only long utterances go through the splitter; short ones are kept
+        # as-is (one chunk each)
+        long_idx = np.flatnonzero(lengths > self.chunk_size).tolist()
+        pieces = {i: self.split_text(contents[i]) for i in long_idx}
+
+        counts = np.ones(n, dtype=np.int64)
+        if long_idx:
+            counts[long_idx] = [len(pieces[i]) for i in long_idx]
+            texts = [
+                text
+                for i, content in enumerate(contents)
+                for text in pieces.get(i, (content,))
+            ]
+        else:
+            texts = contents
+
+        # Per-chunk columns derived from per-utterance values
+        total = len(texts)
+        owner = np.repeat(np.arange(n), counts)
+        first = np.repeat(np.cumsum(counts) - counts, counts)
+        owners = owner.tolist()
+
+        prefix = (
+            f"chunk_{hashlib.sha1(source.encode('utf-8')).hexdigest()[:16]}"
+            if source
+            else "chunk"
+        )
+        return ChunkBatch(
+            ids=[f"{prefix}_{i:06d}" for i in range(total)],
+            texts=texts,
+            speakers=[utterances[i]["speaker"] for i in owners],
+            timestamps=[utterances[i]["timestamp"] for i in owners],
+            chunk_indices=np.arange(total, dtype=np.int64) - first,
+            original_lengths=lengths[owner],
+        )
+
+    def split_text(self, content: str) -> List[str]:
+        """
+        Split text into overlapping chunks of at most chunk_size characters,
+        preferring to cut right after a newline, sentence end or space
+        Args:
+            content: Text to split
+        Returns:
+            List of chunk texts
+        """
+        n = len(content)
+        if n <= self.chunk_size:
+            return [content]
+
+        # Sorted boundary offsets; the end of the text is always a boundary
+        bounds = np.fromiter(
+            (m.end() for m in _CHUNK_SEP_RE.finditer(content)), dtype=np.int64
+        )
+        bounds = np.append(bounds, n)
+
+        pieces = []
+        start = 0
+        while start < n:
+            limit = start + self.chunk_size
+            hard_cut = False
+            if limit >= n:
+                end = n
             else:
-                # Keep short utterances as-is
-                chunks.append(
-                    ConversationChunk(
-                        id=f"chunk_{chunk_id:06d}",
-                        text=content,
-                        speaker=utterance["speaker"],
-                        timestamp=utterance["timestamp"],
-                        chunk_index=0,
-                        original_length=len(content),
-                    )
-                )
-                chunk_id += 1
+                # Last boundary within (start + overlap, limit], else hard cut
+                # at limit (this guarantees every chunk moves past the last)
+                i = np.searchsorted(bounds, limit, side="right") - 1
+                if i >= 0 and bounds[i] > start + self.chunk_overlap:
+                    end = int(bounds[i])
+                else:
+                    end, hard_cut = limit, True
+
+            piece = content[start:end].strip()
+            if piece:
+                pieces.append(piece)
+            if end >= n:
+                break
+
+            # Next chunk starts at the first boundary inside the overlap window.
+            # Without one, hard cuts overlap mid-text and boundary cuts don't.
+            window_start = end - self.chunk_overlap
+            j = np.searchsorted(bounds, window_start, side="left")
+            next_start = int(bounds[j])
+            if next_start < end:
+                start = next_start
+            else:
+                start = window_start if hard_cut else end
 
-        return chunks
+        return pieces
 
-    def generate_embeddings(self, chunks: List[ConversationChunk]) -> List[np.ndarray]:
+    def generate_embeddings(self, chunks: ChunkBatch) -> np.ndarray:
         """
         Vectorize chunks
         Args:
-            chunks: List of chunks
+            chunks: Batch of chunks
         Returns:
-            List of embedding vectors
+            Embedding matrix (one row per chunk)
         """
-        texts = [chunk.text for chunk in chunks]
-        embeddings = self.embedding_model.encode(texts)
+        texts = chunks.texts
+
+        # Smart batching: encode in length order so each mini-batch pads to
+        # similar lengths, then scatter rows back to the original order
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+        order = np.argsort(lengths, kind="stable")
+
+        # Unit-length vectors make the IP metric equal to cosine similarity
+        sorted_embeddings = self.embedding_model.encode(
+            [texts[i] for i in order],
+            batch_size=ENCODE_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+
+        # FP16 outputs must be widened for Milvus FLOAT_VECTOR
+        embeddings = np.empty(sorted_embeddings.shape, dtype=np.float32)
+        embeddings[order] = sorted_embeddings
         print(f"✅ Vectorized {len(chunks)} chunks")
         return embeddings
 
     def insert_to_zilliz(
-        self, chunks: List[ConversationChunk], embeddings: List[np.ndarray]
+        self,
+        chunks: Union[ChunkBatch, List[ConversationChunk]],
+        embeddings: np.ndarray,
+        wait: bool = True,
     ):
         """
         Insert data into Zilliz Cloud
         Args:
-            chunks: List of chunks
-            embeddings: List of embedding vectors
+            chunks: Batch of chunks (a list of ConversationChunk is also accepted)
+            embeddings: Embedding matrix (one row per chunk)
+            wait: Block until the insert completes; when False the insert
+                runs asynchronously and finalize() waits for it
+        Rows are upserted, so re-processing a file into a reused collection
+        replaces its chunks instead of duplicating them.
         """
-        data = [
-            [chunk.id for chunk in chunks],
-            embeddings.tolist(),
-            [chunk.text for chunk in chunks],
-            [chunk.speaker for chunk in chunks],
-            [chunk.timestamp for chunk in chunks],
-            [chunk.chunk_index for chunk in chunks],
-            [chunk.original_length for chunk in chunks],
-        ]
+        if not isinstance(chunks, ChunkBatch):
+            chunks = ChunkBatch.from_chunks(chunks)
+
+        # pymilvus accepts ndarray rows directly; avoid a nested-list copy
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
 
         try:
-            self.collection.insert(data)
-            print(f"✅ Saved {len(chunks)} chunks to Zilliz Cloud")
-
-            # Create index
-            index_params = {
-                "metric_type": "IP",  # Inner Product
-                "index_type": "IVF_FLAT",
-                "params": {"nlist": 128},
-            }
+            for data in self._iter_insert_batches(chunks, embeddings):
+                if wait:
+                    self.collection.upsert(data)
+                else:
+                    self._insert_futures.append(
+                        self.collection.upsert(data, _async=True)
+                    )
+            if wait:
+                print(f"✅ Saved {len(chunks)} chunks to Zilliz Cloud")
+            else:
+                print(f"📤 Sending {len(chunks)} chunks to Zilliz Cloud...")
+
+        except Exception as e:
+            print(f"❌ Data insertion error: {e}")
+            raise
+
+    def _insert_pending(self):
+        """Start an asynchronous insert of all queued chunks"""
+        if not self._pending_chunks:
+            return
+        chunks = ChunkBatch.concat(self._pending_chunks)
+        embeddings = np.concatenate(self._pending_embeddings)
+        self._pending_chunks = []
+        self._pending_embeddings = []
+        self._pending_rows = 0
+        self.insert_to_zilliz(chunks, embeddings, wait=False)
+
+    def finalize(self):
+        """
+        Insert the remaining queued chunks, wait for all outstanding inserts,
+        then flush once, create the index and load the collection.
+        Call once after every file has been processed.
+        """
+        self._insert_pending()
+
+        try:
+            # Wait for the asynchronous inserts
+            futures, self._insert_futures = self._insert_futures, []
+            for future in futures:
+                future.result()
+            print("✅ Saved all chunks to Zilliz Cloud")
+        except Exception as e:
+            print(f"❌ Data insertion error: {e}")
+            raise
+
+        try:
+            self.collection.flush()
+            num_entities = self.collection.num_entities
+            index_type = self._embedding_index_type()
+
+            # A reused collection that outgrew brute-force search is re-indexed
+            if index_type == "FLAT" and num_entities > FLAT_INDEX_MAX_ROWS:
+                self.collection.release()
+                self.collection.drop_index()
+                self._index_type = index_type = None
+                print(f"🔧 Rebuilding FLAT index as HNSW ({num_entities} rows)")
+
+            # A reused collection otherwise keeps its existing index
+            if index_type is not None:
+                self.collection.load()
+                print(f"✅ Loaded collection with existing {index_type} index")
+                return
+
+            # Create index (HNSW, or exact FLAT search for tiny collections)
+            if num_entities <= FLAT_INDEX_MAX_ROWS:
+                index_params = {"metric_type": "IP", "index_type": "FLAT"}
+            else:
+                index_params = {
+                    "metric_type": "IP",  # Inner Product
+                    "index_type": "HNSW",
+                    "params": {
+                        "M": self.hnsw_m,
+                        "efConstruction": self.hnsw_ef_construction,
+                    },
+                }
             self.collection.create_index("embedding", index_params)
+            self._index_type = index_params["index_type"]
             self.collection.load()
             print("✅ Created index and loaded collection")
 
         except Exception as e:
-            print(f"❌ Data insertion error: {e}")
+            print(f"❌ Index creation error: {e}")
             raise
 
-    def process_monologue(self, text: str):
+    def _embedding_index_type(self):
+        """Index type of the embedding field (None without an index), cached"""
+        if self._index_type is None and self.collection.has_index():
+            self._index_type = self.collection.index().params.get("index_type")
+        return self._index_type
+
+    @staticmethod
+    def _iter_insert_batches(
+        chunks: ChunkBatch,
+        embeddings: np.ndarray,
+        batch_size: int = INSERT_BATCH_SIZE,
+    ):
+        """
+        Yield column-based insert payloads of at most batch_size rows
+        Args:
+            chunks: Batch of chunks
+            embeddings: Embedding matrix (float32, C-contiguous)
+            batch_size: Maximum rows per payload
+        """
+        for start in range(0, len(chunks), batch_size):
+            end = start + batch_size
+            yield [
+                chunks.ids[start:end],
+                embeddings[start:end],
+                chunks.texts[start:end],
+                chunks.speakers[start:end],
+                chunks.timestamps[start:end],
+                chunks.chunk_indices[start:end],
+                chunks.original_lengths[start:end],
+            ]
+
+    def process_monologue(self, text: str, source: str = ""):
         """
-        Complete processing of monologue text
+        Complete processing of monologue text. The resulting chunks are
+        queued and sent to Zilliz Cloud asynchronously in full batches;
+        finalize() sends the rest and waits for completion.
         Args:
             text: Monologue text
+            source: Source file key (used for the chunk ids)
         """
         print("🔄 Starting monologue text processing...")
 
@@ -262,14 +594,21 @@ class ConversationVectorizer:
         print(f"📝 Split into {len(utterances)} units")
 
         # 2. Create chunks
-        chunks = self.chunk_conversations(utterances)
+        chunks = self.chunk_conversations(utterances, source)
         print(f"✂️ Split into {len(chunks)} chunks")
 
         # 3. Vectorize
         embeddings = self.generate_embeddings(chunks)
 
-        # 4. Save to Zilliz Cloud
-        self.insert_to_zilliz(chunks, embeddings)
+        # 4. Queue for the batched insert in finalize()
+        self._pending_chunks.append(chunks)
+        self._pending_embeddings.append(embeddings)
+        self._pending_rows += len(chunks)
+
+        # Once a full batch is queued, send it in the background while the
+        # next file is being encoded
+        if self._pending_rows >= INSERT_BATCH_SIZE:
+            self._insert_pending()
 
         print("🎉 Processing completed!")
         return chunks
@@ -283,10 +622,16 @@ class ConversationVectorizer:
         Returns:
             Search results
         """
-        # Vectorize query
-        query_embedding = self.embedding_model.encode([query])
+        # Vectorize query (normalized like the stored vectors)
+        query_embedding = self.embedding_model.encode(
+            [query], convert_to_numpy=True, normalize_embeddings=True
+        ).astype(np.float32, copy=False)
 
-        search_params = {"metric_type": "IP", "params": {"nprobe": 10}}
+        # HNSW: ef must be at least the number of results requested; FLAT
+        # takes no search params
+        search_params = {"metric_type": "IP", "params": {}}
+        if self._embedding_index_type() != "FLAT":
+            search_params["params"]["ef"] = max(self.search_ef, limit)
 
         results = self.collection.search(
             query_embedding,
@@ -320,13 +665,26 @@ def main():
     zilliz_token = os.getenv("ZILLIZ_TOKEN", "your-zilliz-token")
     try:
         vectorizer = ConversationVectorizer(zilliz_uri, zilliz_token)
-        for json_file_key in json_files:
-            print(f"Processing file: {json_file_key}")
 
-            # Extract text from JSON file
-            result = extractor.extract_text_from_s3_json(bucket_name, json_file_key)
-            sample_monologue = result["extracted_texts"][0]["text"]
-            chunks = vectorizer.process_monologue(sample_monologue)
+        # Fetch and extract JSON files concurrently so the encoder doesn't
+        # sit idle waiting on S3; files are encoded as soon as they arrive
+        with ThreadPoolExecutor(max_workers=S3_FETCH_WORKERS) as executor:
+            futures = {
+                executor.submit(
+                    extractor.extract_text_from_s3_json, bucket_name, json_file_key
+                ): json_file_key
+                for json_file_key in json_files
+            }
+            for future in as_completed(futures):
+                print(f"Processing file: {futures[future]}")
+
+                # Extract text from JSON file
+                result = future.result()
+                sample_monologue = result["extracted_texts"][0]["text"]
+                chunks = vectorizer.process_monologue(sample_monologue, futures[future])
+
+        # Save all files' chunks and build the index once
+        vectorizer.finalize()
 
     except Exception as e:
         print(f"❌ An error occurred: {e}")
@@ -3,9 +3,15 @@ Main conversation vectorizer orchestrating all components
 """
 
 import os
+import queue
 import sys
+import threading
+
 import numpy as np
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import attrgetter
+from typing import Iterator, List, Dict, Tuple
 
 # Add src directory to Python path when running as standalone script
 if __name__ == "__main__":
@@ -14,10 +20,15 @@ if __name__ == "__main__":
     if src_dir not in sys.path:
         sys.path.insert(0, src_dir)
 
-from models.conversation_chunk import ConversationChunk, SearchResult
+from models.conversation_chunk import (
+    ConversationChunk,
+    SearchResult,
+    EmbeddingResult,
+)
 from services.processing.text_processor import TextProcessor
 from services.processing.vector_generator import HybridVectorGenerator
 from services.processing.tfidf_vectorizer import TfidfSparseVectorizer
+from services.processing.torch_threads import configure_torch_threads
 from services.database.zilliz_client import ZillizClient
 from services.data.extract_text_fromS3 import S3JsonTextExtractor
 
@@ -26,6 +37,11 @@ from dotenv import load_dotenv, find_dotenv
 # Load .env from project root (robust in various run contexts)
 load_dotenv(find_dotenv(usecwd=True))
 
+# Maximum number of distinct queries kept in each query-embedding cache
+QUERY_CACHE_SIZE = 1024
+# Chunks encoded and inserted together; bounds peak embedding memory per file
+EMBED_BATCH_SIZE = 256
+
 
 class ConversationVectorizer:
     """Main conversation vectorizer orchestrating all components"""
@@ -61,7 +77,7 @@ class ConversationVectorizer:
         print("✅ HybridVectorGenerator initialized")
 
         print("🔧 Initializing ZillizClient...")
-        self.zilliz_client = ZillizClient(zilliz_uri, zilliz_token, collection_name)
+        self.zilliz_client = ZillizClient.get(zilliz_uri, zilliz_token, collection_name)
         print("✅ ZillizClient initialized")
 
         # Initialize TF-IDF sparse vectorizer
@@ -72,11 +88,13 @@ class ConversationVectorizer:
             min_df=1,
             max_df=0.95,
             use_mecab=True,  # Re-enable to see detailed error
+            use_hashing=os.getenv("TFIDF_USE_HASHING", "false").lower() == "true",
         )
         print("✅ TfidfSparseVectorizer initialized")
 
         # Try to load a pre-fitted TF-IDF model if specified
         tfidf_model_path = os.getenv("TFIDF_MODEL_PATH")
+        self.tfidf_model_path = tfidf_model_path
         if tfidf_model_path and os.path.exists(tfidf_model_path):
             try:
                 self.sparse_vectorizer = TfidfSparseVectorizer.load_sklearn(
@@ -91,6 +109,14 @@ class ConversationVectorizer:
             except Exception as e:
                 print(f"⚠️ Failed to load TF-IDF model ({tfidf_model_path}): {e}")
 
+        # Bounded caches for query embeddings (repeated queries skip encoding)
+        self._dense_query_cache = lru_cache(maxsize=QUERY_CACHE_SIZE)(
+            self._encode_dense_query
+        )
+        self._sparse_query_cache = lru_cache(maxsize=QUERY_CACHE_SIZE)(
+            self._encode_sparse_query
+        )
+
         print("✅ ConversationVectorizer initialized with all components")
 
     def process_monologue(self, text: str, file_name: str) -> List[ConversationChunk]:
@@ -102,36 +128,91 @@ class ConversationVectorizer:
         Returns:
             List of processed chunks
         """
+        chunks = []
+        for batch, embeddings in self.iter_monologue_batches(text, file_name):
+            # 5. Insert into Zilliz
+            self.zilliz_client.insert_data(batch, embeddings)
+            chunks.extend(batch)
+        self.zilliz_client.flush()
+
+        print("🎉 Hybrid processing completed!")
+        return chunks
+
+    def iter_monologue_batches(
+        self, text: str, file_name: str
+    ) -> Iterator[Tuple[List[ConversationChunk], EmbeddingResult]]:
+        """
+        Chunk monologue text and embed it EMBED_BATCH_SIZE chunks at a time,
+        without inserting; only one batch of embeddings is alive at once
+        Args:
+            text: Monologue text
+            file_name: Name of the file being processed
+        Yields:
+            Tuples of (chunks, embeddings) ready for ZillizClient.insert_data
+        """
         print("🔄 Starting hybrid monologue processing...")
 
         # 1. Process text into chunks
         chunks = self.text_processor.process_text(text, file_name)
 
-        # 2. Generate dense embeddings
-        dense_embeddings = self.vector_generator.dense_generator.generate(
-            [chunk.text for chunk in chunks]
-        )
-
-        # 3. Generate sparse embeddings using TF-IDF
-        texts = [chunk.text for chunk in chunks]
+        # The TF-IDF vocabulary is fitted once, on the first file, so every
+        # batch can then be transformed independently
         if not self.sparse_vectorizer.is_fitted:
-            sparse_embeddings = self.sparse_vectorizer.fit_transform(texts)
-        else:
-            sparse_embeddings = self.sparse_vectorizer.transform(texts)
+            self._fit_sparse(list(map(attrgetter("text"), chunks)))
 
-        # 4. Create embeddings result
-        from models.conversation_chunk import EmbeddingResult
+        # 2-3. Dense (transformer) and sparse (TF-IDF) embeddings are
+        # independent and both release the GIL, so run them side by side
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for start in range(0, len(chunks), EMBED_BATCH_SIZE):
+                batch = chunks[start : start + EMBED_BATCH_SIZE]
+                texts = list(map(attrgetter("text"), batch))
 
-        embeddings = EmbeddingResult(
-            dense_embeddings=dense_embeddings,
-            sparse_embeddings=sparse_embeddings,
-        )
+                dense_future = executor.submit(
+                    self.vector_generator.dense_generator.generate, texts
+                )
+                sparse_future = executor.submit(
+                    self.sparse_vectorizer.transform_matrix, texts
+                )
 
-        # 5. Insert into Zilliz
-        self.zilliz_client.insert_data(chunks, embeddings)
+                # 4. Create embeddings result
+                yield batch, EmbeddingResult(
+                    dense_embeddings=dense_future.result(),
+                    sparse_embeddings=sparse_future.result(),
+                )
 
-        print("🎉 Hybrid processing completed!")
-        return chunks
+    def _fit_sparse(self, texts: List[str]) -> None:
+        """
+        Fit the TF-IDF vectorizer and persist it
+        Args:
+            texts: Chunk texts used to learn the vocabulary and IDF
+        """
+        self.sparse_vectorizer.fit(texts)
+        # Cached sparse queries belong to the previous vocabulary
+        self._sparse_query_cache.cache_clear()
+        self._save_tfidf_model()
+
+    def _save_tfidf_model(self) -> None:
+        """Persist the freshly fitted TF-IDF model so later runs skip the fit"""
+        if not self.tfidf_model_path or not self.sparse_vectorizer.is_fitted:
+            return
+        try:
+            self.sparse_vectorizer.save_sklearn(self.tfidf_model_path)
+            print(f"💾 Saved TF-IDF model to: {self.tfidf_model_path}")
+        except Exception as e:
+            print(f"⚠️ Failed to save TF-IDF model ({self.tfidf_model_path}): {e}")
+
+    def _encode_dense_query(self, query: str) -> np.ndarray:
+        """Dense query embedding (uncached; use _dense_query_cache)"""
+        embedding = self.vector_generator.dense_generator.generate_query_embedding(
+            query
+        )
+        # The same array is returned for every cache hit
+        embedding.setflags(write=False)
+        return embedding
+
+    def _encode_sparse_query(self, query: str) -> Dict[int, float]:
+        """Sparse TF-IDF query vector (uncached; use _sparse_query_cache)"""
+        return self.sparse_vectorizer.transform_query(query)
 
     def hybrid_search(
         self, query: str, limit: int = 5, rerank_k: int = 100
@@ -147,15 +228,14 @@ class ConversationVectorizer:
         """
         try:
             # Generate dense query embedding
-            dense_query = (
-                self.vector_generator.dense_generator.generate_query_embedding(query)
-            )
+            dense_query = self._dense_query_cache(query)
 
             # Generate sparse query embedding using TF-IDF (fallback to dense if not fitted)
             if not getattr(self.sparse_vectorizer, "is_fitted", False):
                 print("ℹ️ TF-IDF not fitted. Falling back to dense search.")
                 return self.search_similar(query, limit)
-            sparse_query = self.sparse_vectorizer.transform([query])[0]
+            # Copy so callers cannot mutate the cached dict shared by later hits
+            sparse_query = dict(self._sparse_query_cache(query))
 
             # Perform hybrid search
             results = self.zilliz_client.hybrid_search(
@@ -179,9 +259,7 @@ class ConversationVectorizer:
         """
         try:
             # Generate dense query embedding only
-            dense_query = (
-                self.vector_generator.dense_generator.generate_query_embedding(query)
-            )
+            dense_query = self._dense_query_cache(query)
 
             # Perform dense search
             results = self.zilliz_client.dense_search(dense_query, limit)
@@ -238,16 +316,48 @@ def main():
         )
         print("✅ ConversationVectorizer initialized successfully!")
 
-        # Process files
-        for json_file_key in json_files:
-            print(f"\nProcessing file: {json_file_key}")
-
-            # Extract text from JSON file
-            result = extractor.extract_text_from_s3_json(bucket_name, json_file_key)
-            sample_monologue = result["extracted_texts"][0]["text"]
-
-            # Process monologue
-            chunks = vectorizer.process_monologue(sample_monologue, json_file_key)
+        # Process files: this thread downloads, chunks and embeds while a
+        # consumer thread inserts the previous file into Zilliz
+        prepared = queue.Queue(maxsize=2)
+        insert_errors = []
+
+        def insert_worker():
+            while True:
+                item = prepared.get()
+                if item is None:
+                    break
+                if insert_errors:
+                    continue  # Drain remaining items after a failure
+                try:
+                    vectorizer.zilliz_client.insert_data(*item)
+                except Exception as e:
+                    insert_errors.append(e)
+
+        inserter = threading.Thread(target=insert_worker, daemon=True)
+        inserter.start()
+        try:
+            for json_file_key in json_files:
+                if insert_errors:
+                    break
+                print(f"\nProcessing file: {json_file_key}")
+
+                # Extract text from JSON file
+                result = extractor.extract_text_from_s3_json(bucket_name, json_file_key)
+                sample_monologue = result["extracted_texts"][0]["text"]
+
+                # Chunk + embed batch by batch, handing each off for insertion
+                for item in vectorizer.iter_monologue_batches(
+                    sample_monologue, json_file_key
+                ):
+                    if insert_errors:
+                        break
+                    prepared.put(item)
+        finally:
+            prepared.put(None)
+            inserter.join()
+        if insert_errors:
+            raise insert_errors[0]
+        vectorizer.zilliz_client.flush()
 
         # Test searches
         print("\n🔍 Hybrid Search test:")
@@ -278,4 +388,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Batch run owns the machine: size torch's CPU pools for it
+    configure_torch_threads()
     main()
@@ -34,10 +34,19 @@ class DenseVectorGenerator:
         Returns:
             Dense embeddings (L2 normalized)
         """
-        embeddings = self.model.encode(texts)
-
-        # Apply L2 normalization for cosine similarity
-        embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        # Smart batching: encode in length order so each batch pads to
+        # similar lengths, then scatter rows back to the input order
+        order = np.argsort([len(t) for t in texts], kind="stable")
+        sorted_embeddings = self.model.encode(
+            [texts[i] for i in order],
+            batch_size=64,
+            convert_to_numpy=True,
+            # L2 normalization for cosine similarity, applied inside encode
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        embeddings = np.empty_like(sorted_embeddings)
+        embeddings[order] = sorted_embeddings
 
         print(f"✅ Generated {len(texts)} dense embeddings")
         return embeddings
@@ -50,9 +59,9 @@ class DenseVectorGenerator:
         Returns:
             Query embedding (L2 normalized)
         """
-        embedding = self.model.encode([query])
-        embedding = embedding / np.linalg.norm(embedding, axis=1, keepdims=True)
-        return embedding
+        return self.model.encode(
+            [query], convert_to_numpy=True, normalize_embeddings=True
+        )
 
 
 class SparseVectorGenerator:
@@ -95,11 +104,18 @@ class SparseVectorGenerator:
         adjusted_min_df = min(self.min_df, max(1, num_docs // 10))
         adjusted_max_df = self.max_df
 
-        # Ensure min_df doesn't exceed max_df threshold
-        max_df_count = int(num_docs * adjusted_max_df)
-        if adjusted_min_df > max_df_count:
-            adjusted_min_df = 1
-            adjusted_max_df = 1.0
+        # sklearn rejects max_df (as a count) below min_df; pick the
+        # permissive settings up front instead of fitting twice
+        max_df_count = num_docs * adjusted_max_df
+        if num_docs < 3 or max_df_count < adjusted_min_df:
+            print(f"⚠️ TF-IDF docs={num_docs}: using permissive fallback settings")
+            return TfidfVectorizer(
+                max_features=min(self.max_features, 1000),
+                ngram_range=(1, 1),  # Only unigrams
+                min_df=1,
+                max_df=1.0,  # Include all documents
+                stop_words=None,
+            )
 
         print(
             f"📊 TF-IDF params: docs={num_docs}, min_df={adjusted_min_df}, max_df={adjusted_max_df}"
@@ -127,32 +143,12 @@ class SparseVectorGenerator:
         # Create vectorizer with adjusted parameters
         self.vectorizer = self._create_vectorizer(len(texts))
 
-        try:
-            sparse_vectors = self.vectorizer.fit_transform(texts)
-            self.is_fitted = True
-
-            print(f"✅ Generated sparse vectors: {sparse_vectors.shape}")
-            print(f"   Vocabulary size: {len(self.vectorizer.vocabulary_)}")
-            return sparse_vectors
-
-        except ValueError as e:
-            if "max_df corresponds to < documents than min_df" in str(e):
-                print("⚠️ TF-IDF parameter conflict, using fallback settings...")
-                # Fallback: very permissive settings
-                self.vectorizer = TfidfVectorizer(
-                    max_features=min(self.max_features, 1000),
-                    ngram_range=(1, 1),  # Only unigrams
-                    min_df=1,
-                    max_df=1.0,  # Include all documents
-                    stop_words=None,
-                )
-                sparse_vectors = self.vectorizer.fit_transform(texts)
-                self.is_fitted = True
-
-                print(f"✅ Generated sparse vectors (fallback): {sparse_vectors.shape}")
-                return sparse_vectors
-            else:
-                raise e
+        sparse_vectors = self.vectorizer.fit_transform(texts)
+        self.is_fitted = True
+
+        print(f"✅ Generated sparse vectors: {sparse_vectors.shape}")
+        print(f"   Vocabulary size: {len(self.vectorizer.vocabulary_)}")
+        return sparse_vectors
 
     def generate(self, texts: List[str]) -> sp.csr_matrix:
         """
@@ -190,16 +186,22 @@ class SparseVectorGenerator:
         Returns:
             List of sparse vectors in Zilliz format
         """
+        sparse_matrix = sp.csr_matrix(sparse_matrix)
+        indptr, indices, data = (
+            sparse_matrix.indptr,
+            sparse_matrix.indices,
+            sparse_matrix.data,
+        )
         sparse_vectors = []
 
+        # Slice the CSR arrays per row instead of building a row matrix
         for i in range(sparse_matrix.shape[0]):
-            row = sparse_matrix.getrow(i)
-            indices = row.indices
-            data = row.data
+            start, end = indptr[i], indptr[i + 1]
 
             # Zilliz sparse vector format: {index: value}
-            sparse_dict = {int(idx): float(val) for idx, val in zip(indices, data)}
-            sparse_vectors.append(sparse_dict)
+            sparse_vectors.append(
+                dict(zip(indices[start:end].tolist(), data[start:end].tolist()))
+            )
 
         return sparse_vectors
 
@@ -280,8 +282,12 @@ class HybridVectorGenerator:
         sparse_query_matrix = self.sparse_generator.generate_query_vector(
             preprocessed_query
         )
-        sparse_query = self.sparse_generator.sparse_matrix_to_dict(sparse_query_matrix)[
-            0
-        ]
+        # 1xV CSR: its indices/data are the query's sparse entries
+        sparse_query = dict(
+            zip(
+                sparse_query_matrix.indices.tolist(),
+                sparse_query_matrix.data.tolist(),
+            )
+        )
 
         return dense_query, sparse_query
@@ -3,7 +3,7 @@ Data classes for conversation processing
 """
 
 from dataclasses import dataclass
-from typing import Dict, Any, List
+from typing import Dict, Any
 
 
 @dataclass
@@ -49,7 +49,7 @@ class EmbeddingResult:
     """Data class for embedding generation results"""
 
     dense_embeddings: Any  # np.ndarray
-    sparse_embeddings: List[Dict[int, float]]
+    sparse_embeddings: Any  # List[Dict[int, float]] or scipy CSR matrix
 
     @property
     def count(self) -> int:
@@ -1,11 +1,15 @@
 import boto3
+from botocore.config import Config
 import logging
 import os
 import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dotenv import load_dotenv
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from services.aws.boto_config import BOTO_CONFIG
 from services.database.youtube_dynamodb_client import YoutubeDynamoDBClient
 
 # ログ設定
@@ -14,35 +18,32 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-sqs = boto3.client(
-    "sqs",
+# SQS/Transcribeクライアントは1つのSessionと接続プールを共有する
+session = boto3.Session(
     aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
     aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
     region_name=os.getenv("AWS_REGION"),
 )
-
-transcribe = boto3.client(
-    "transcribe",
-    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-    region_name=os.getenv("AWS_REGION"),
+# 共通設定をベースに、Transcribeのスロットリングに備えてリトライ回数だけ増やす
+client_config = BOTO_CONFIG.merge(
+    Config(retries={"mode": "adaptive", "max_attempts": 10})
 )
 
+sqs = session.client("sqs", config=client_config)
+
+transcribe = session.client("transcribe", config=client_config)
+
 # DynamoDBクライアント初期化
 dynamodb_client = YoutubeDynamoDBClient()
 
-# SQSからメッセージ受信し、Transcribeジョブを実行
-logger.info("SQS URL : " + os.getenv("SQS_QUEUE_URL"))
-while True:
-    response = sqs.receive_message(
-        QueueUrl=os.getenv("SQS_QUEUE_URL"), MaxNumberOfMessages=1, WaitTimeSeconds=10
-    )
-    messages = response.get("Messages", [])
-    if not messages:
-        logger.info("No messages in SQS queue. Waiting...")
-        continue
-
-    message = messages[0]
+# 同時に処理するメッセージ（Transcribeジョブ）数の上限（SQSの最大は10）
+MAX_CONCURRENT_JOBS = 10
+# ジョブステータスの確認間隔（秒）
+POLL_INTERVAL_SECONDS = 30
+
+
+def handle_message(message):
+    """1件のSQSメッセージについてTranscribeジョブを開始し、完了まで監視する"""
     logger.info(f"Received message: {message['MessageId']}")
     body = json.loads(message["Body"])
     # S3ファイルパス取得
@@ -50,10 +51,7 @@ while True:
     s3_key = body.get("detail", {}).get("object", {}).get("key")
     if not s3_bucket or not s3_key:
         logger.error(f"S3 path or bucket not found in SQS message: {body}")
-        sqs.delete_message(
-            QueueUrl=os.getenv("SQS_QUEUE_URL"), ReceiptHandle=message["ReceiptHandle"]
-        )
-        continue
+        return
 
     file_id = os.path.splitext(os.path.basename(s3_key))[0]
     media_uri = f"s3://{s3_bucket}/{s3_key}"
@@ -92,15 +90,50 @@ while True:
                 # 失敗時はフラグを0のまま残す（更新しない）
                 break
             else:
-                logger.info(f"Transcription job status: {status}. Waiting...")
-                import time
-
-                time.sleep(30)  # 30秒待機
+                logger.info(
+                    f"Transcription job status ({file_id}): {status}. Waiting..."
+                )
+                time.sleep(POLL_INTERVAL_SECONDS)
 
     except Exception as e:
         logger.error(f"Failed to start transcription job for {file_id}: {e}")
 
-    # SQSメッセージを削除
-    sqs.delete_message(
-        QueueUrl=os.getenv("SQS_QUEUE_URL"), ReceiptHandle=message["ReceiptHandle"]
-    )
+
+# SQSからメッセージ受信し、Transcribeジョブを実行
+# 空きスロット分だけ受信し、完了したジョブから順にメッセージを削除する
+# （長いジョブがあっても他のスロットは次のメッセージを処理できる）
+logger.info("SQS URL : " + os.getenv("SQS_QUEUE_URL"))
+# 処理中のジョブ（future -> receipt handle）
+in_flight = {}
+with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_JOBS) as executor:
+    while True:
+        # 空きスロットがなければいずれかの完了を待つ
+        if len(in_flight) >= MAX_CONCURRENT_JOBS:
+            wait(in_flight, return_when=FIRST_COMPLETED)
+
+        for future in [f for f in in_flight if f.done()]:
+            receipt_handle = in_flight.pop(future)
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Unexpected error while handling message: {e}")
+
+            # SQSメッセージを削除
+            sqs.delete_message(
+                QueueUrl=os.getenv("SQS_QUEUE_URL"), ReceiptHandle=receipt_handle
+            )
+
+        response = sqs.receive_message(
+            QueueUrl=os.getenv("SQS_QUEUE_URL"),
+            MaxNumberOfMessages=MAX_CONCURRENT_JOBS - len(in_flight),
+            WaitTimeSeconds=10,
+        )
+        messages = response.get("Messages", [])
+        if not messages:
+            if not in_flight:
+                logger.info("No messages in SQS queue. Waiting...")
+            continue
+
+        for message in messages:
+            future = executor.submit(handle_message, message)
+            in_flight[future] = message["ReceiptHandle"]
@@ -1,15 +1,30 @@
-import binascii
+import asyncio
 import boto3
+import hashlib
+import io
 import logging
 import os
 import json
+import random
 import requests
+import threading
 import time
-from typing import Dict, Any, Optional
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from botocore.exceptions import ClientError
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
+
+try:
+    import orjson  # C実装の高速JSON（bytesを直接パース/出力）
+except ImportError:
+    orjson = None
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from services.aws.boto_config import BOTO_CONFIG
 from services.database.youtube_dynamodb_client import YouTubeDynamoDBClient
 
 # ログ設定
@@ -18,6 +33,53 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# 転写ステータス確認の初回間隔・上限（秒）、毎回の伸び率
+POLL_INITIAL_DELAY = 2.0
+POLL_MAX_DELAY = 30.0
+POLL_BACKOFF = 1.5
+
+# 署名付きURLの有効期限（秒）：Gladiaが音声を取得し終えるまで有効であること
+PRESIGNED_URL_EXPIRES = 3600
+
+
+class _MultipartStream:
+    """S3のStreamingBodyを1ファイルのmultipart/form-dataボディとして読み出すラッパー
+
+    requestsはファイルライクなボディをチャンク単位で送信し、Content-Lengthを
+    __len__から取得するため、音声をメモリに載せずにS3からGladiaへ転送できる。
+    """
+
+    def __init__(self, field, filename, content_type, body, body_length):
+        self.boundary = uuid.uuid4().hex
+        head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+        tail = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+        self._parts = [io.BytesIO(head), body, io.BytesIO(tail)]
+        self._length = len(head) + body_length + len(tail)
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        out = bytearray()
+        while self._parts:
+            want = None if size is None or size < 0 else size - len(out)
+            if want == 0:
+                break
+            data = self._parts[0].read(want)
+            if not data:
+                self._parts.pop(0)
+                continue
+            out += data
+        return bytes(out)
+
 
 class GladiaTranscriber:
     """Gladia.ioを使用した音声転写クラス"""
@@ -30,12 +92,25 @@ class GladiaTranscriber:
         if not self.gladia_api_key:
             raise ValueError("GLADIA_API_KEY環境変数が設定されていません")
 
+        # Gladia API用HTTPセッション（keep-aliveで接続を再利用、ポーリング毎のTLSハンドシェイクを回避）
+        self.http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]
+            ),
+        )
+        self.http.mount("https://", adapter)
+        self.http.headers.update({"x-gladia-key": self.gladia_api_key})
+
         # AWS S3クライアント
         self.s3_client = boto3.client(
             "s3",
             aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
             aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
             region_name=os.getenv("AWS_REGION"),
+            config=BOTO_CONFIG,
         )
 
         # SQSクライアント
@@ -44,9 +119,15 @@ class GladiaTranscriber:
             aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
             aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
             region_name=os.getenv("AWS_REGION"),
+            config=BOTO_CONFIG,
         )
 
         self.output_bucket = os.getenv("TRANSCRIBE_OUTPUT_BUCKET", "audio4gladia")
+
+        # TrueならS3の署名付きURLをGladiaに直接渡し、音声の中継アップロードを省略
+        self.use_presigned_url = (
+            os.getenv("USE_PRESIGNED_URL", "false").lower() == "true"
+        )
         logger.info(
             f"✅ Gladia Transcriber initialized. Output bucket: {self.output_bucket}"
         )
@@ -56,6 +137,30 @@ class GladiaTranscriber:
         self.dynamodb_client = YouTubeDynamoDBClient(table_name=table_name)
         logger.info("✅ DynamoDB client initialized")
 
+        # 最初のメッセージでTLSハンドシェイクを直列に待たないよう、裏で接続を開いておく
+        threading.Thread(target=self._prewarm, daemon=True).start()
+
+    def _prewarm(self):
+        """S3・SQS・DynamoDBに軽いリクエストを送り接続プールを温める（失敗は無視）"""
+        calls = [
+            lambda: self.s3_client.head_bucket(Bucket=self.output_bucket),
+            lambda: self.dynamodb_client.table.meta.client.describe_table(
+                TableName=self.dynamodb_client.table_name
+            ),
+        ]
+        queue_url = os.getenv("SQS_QUEUE_URL")
+        if queue_url:
+            calls.append(
+                lambda: self.sqs_client.get_queue_attributes(
+                    QueueUrl=queue_url, AttributeNames=["QueueArn"]
+                )
+            )
+        for call in calls:
+            try:
+                call()
+            except Exception as e:
+                logger.debug(f"Prewarm request failed (ignored): {e}")
+
     def upload_audio_to_gladia(self, s3_bucket: str, s3_key: str) -> str:
         """
         S3の音声ファイルをGladiaにアップロード
@@ -65,30 +170,48 @@ class GladiaTranscriber:
             s3_key: S3オブジェクトキー
 
         Returns:
-            Gladiaの音声URL
+            Gladiaの音声URL（USE_PRESIGNED_URL時はS3の署名付きURL）
         """
         try:
-            # S3から音声ファイルを取得
+            if self.use_presigned_url:
+                # Gladiaが直接S3から取得するため、ダウンロード・再アップロード不要
+                audio_url = self.s3_client.generate_presigned_url(
+                    "get_object",
+                    Params={"Bucket": s3_bucket, "Key": s3_key},
+                    ExpiresIn=PRESIGNED_URL_EXPIRES,
+                )
+                logger.info(f"🔗 Using presigned S3 URL for Gladia: {s3_key}")
+                return audio_url
+
+            # S3から音声ファイルを取得（ボディは読み込まずストリームのまま渡す）
             response = self.s3_client.get_object(Bucket=s3_bucket, Key=s3_key)
-            audio_data = response["Body"].read()
+            body = response["Body"]
             content_type = response.get("ContentType", "audio/mp4")  # ← 追加
+            content_length = response["ContentLength"]
 
-            if isinstance(audio_data, bytes) and len(audio_data) > 0:
-                print("audio_data は有効なバイナリデータです。")
-                print(binascii.hexlify(audio_data[:64]))  # 先頭64バイトを16進数で表示
-            else:
-                print("audio_data は空か、バイナリデータではありません。")
+            if content_length <= 0:
+                raise ValueError(f"S3の音声ファイルが空です: s3://{s3_bucket}/{s3_key}")
 
-            # Gladiaにファイルをアップロード
+            # Gladiaにファイルをアップロード（S3からの読み出しと送信を並行）
             upload_url = f"{self.gladia_base_url}upload"
-            headers = {
-                "x-gladia-key": self.gladia_api_key,
-            }
-
-            files = {"audio": (os.path.basename(s3_key), audio_data, content_type)}
-
-            logger.info(f"📤 Uploading audio file to Gladia: {s3_key}")
-            upload_response = requests.post(upload_url, headers=headers, files=files)
+            try:
+                stream = _MultipartStream(
+                    "audio",
+                    os.path.basename(s3_key),
+                    content_type,
+                    body,
+                    content_length,
+                )
+                logger.info(
+                    f"📤 Uploading audio file to Gladia: {s3_key} ({content_length} bytes)"
+                )
+                upload_response = self.http.post(
+                    upload_url,
+                    data=stream,
+                    headers={"Content-Type": stream.content_type},
+                )
+            finally:
+                body.close()
             upload_response.raise_for_status()
 
             upload_result = upload_response.json()
@@ -118,11 +241,6 @@ class GladiaTranscriber:
             転写ジョブID
         """
         try:
-            headers = {
-                "x-gladia-key": self.gladia_api_key,
-                "Content-Type": "application/json",
-            }
-
             subtitles_config = {"formats": ["srt", "vtt"]}
 
             # 転写リクエストデータ
@@ -136,7 +254,7 @@ class GladiaTranscriber:
 
             logger.info(f"🚀: {file_id}")
             url = f"{self.gladia_base_url}pre-recorded"
-            response = requests.post(url, headers=headers, json=transcription_data)
+            response = self.http.post(url, json=transcription_data)
             response.raise_for_status()
 
             result = response.json()
@@ -167,36 +285,77 @@ class GladiaTranscriber:
         Returns:
             転写結果
         """
-        headers = {
-            "x-gladia-key": self.gladia_api_key,
-        }
-
         start_time = time.time()
+        delay = POLL_INITIAL_DELAY
 
         while time.time() - start_time < max_wait_time:
-            try:
-                response = requests.get(f"{result_url}", headers=headers)
-                response.raise_for_status()
-
-                result = response.json()
-                status = result.get("status")
-
-                if status == "done":
-                    logger.info(f"✅ Transcription completed: {job_id}")
-                    return result
-                elif status == "error":
-                    error_msg = result.get("error", "Unknown error")
-                    raise Exception(f"Gladia transcription failed: {error_msg}")
-                else:
-                    logger.info(f"⏳ Transcription in progress: {status}")
-                    time.sleep(10)  # 10秒待機
+            result = self._check_status(job_id, result_url)
+            if result is not None:
+                return result
+            # 指数バックオフ（ジッター付き、上限POLL_MAX_DELAY秒）
+            time.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
 
-            except Exception as e:
-                logger.error(f"❌ Error checking transcription status: {e}")
-                raise
+        raise TimeoutError(f"Transcription timed out after {max_wait_time} seconds")
+
+    async def wait_for_completion_async(
+        self, job_id: str, result_url, max_wait_time: int = 1800
+    ) -> Dict[str, Any]:
+        """
+        転写ジョブの完了を待機（待機中はスレッドを占有しないasync版）
+
+        Args:
+            job_id: 転写ジョブID
+            result_url: 転写結果URL
+            max_wait_time: 最大待機時間（秒）
+
+        Returns:
+            転写結果
+        """
+        start_time = time.time()
+        delay = POLL_INITIAL_DELAY
+
+        while time.time() - start_time < max_wait_time:
+            result = await asyncio.to_thread(self._check_status, job_id, result_url)
+            if result is not None:
+                return result
+            await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * POLL_BACKOFF, POLL_MAX_DELAY)
 
         raise TimeoutError(f"Transcription timed out after {max_wait_time} seconds")
 
+    def _check_status(self, job_id: str, result_url) -> Optional[Dict[str, Any]]:
+        """
+        転写ジョブのステータスを1回確認
+
+        Args:
+            job_id: 転写ジョブID
+            result_url: 転写結果URL
+
+        Returns:
+            完了時は転写結果、処理中はNone
+        """
+        try:
+            response = self.http.get(f"{result_url}")
+            response.raise_for_status()
+
+            result = response.json()
+            status = result.get("status")
+
+            if status == "done":
+                logger.info(f"✅ Transcription completed: {job_id}")
+                return result
+            elif status == "error":
+                error_msg = result.get("error", "Unknown error")
+                raise Exception(f"Gladia transcription failed: {error_msg}")
+
+            logger.info(f"⏳ Transcription in progress: {status}")
+            return None
+
+        except Exception as e:
+            logger.error(f"❌ Error checking transcription status: {e}")
+            raise
+
     def save_result_to_s3(self, result: Dict[str, Any], file_id: str) -> str:
         """
         転写結果をS3に保存
@@ -228,31 +387,51 @@ class GladiaTranscriber:
             if "result" in result and "transcription" in result["result"]:
                 gladia_result = result["result"]["transcription"]
 
-                # 話者別の結果を処理
+                # 話者別の結果を処理：列ごとに値を取り出してから一度に組み立てる
                 if "utterances" in gladia_result:
-                    for utterance in gladia_result["utterances"]:
-                        item = {
-                            "speaker": "",
-                            "start": utterance.get("start", 0),
-                            "end": utterance.get("end", 0),
-                            "text": utterance.get("text", ""),
-                        }
-                        transcription_json["results"]["transcription"][
-                            "utterances"
-                        ].append(item)
+                    utterances = gladia_result["utterances"]
+                    starts = [u.get("start", 0) for u in utterances]
+                    ends = [u.get("end", 0) for u in utterances]
+                    texts = [u.get("text", "") for u in utterances]
+                    transcription_json["results"]["transcription"]["utterances"] = [
+                        {"speaker": "", "start": start, "end": end, "text": text}
+                        for start, end, text in zip(starts, ends, texts)
+                    ]
 
             # S3にアップロード
             s3_key = f"{file_id}_transcription.json"
+            if orjson is not None:
+                body = orjson.dumps(transcription_json, option=orjson.OPT_INDENT_2)
+            else:
+                body = json.dumps(
+                    transcription_json, ensure_ascii=False, indent=2
+                ).encode("utf-8")
+
+            # 同一内容が保存済みならPUTを省略（再実行時の冪等化）
+            digest = hashlib.sha256(body).hexdigest()
+            try:
+                existing = self.s3_client.head_object(
+                    Bucket=self.output_bucket, Key=s3_key
+                )
+                if existing.get("Metadata", {}).get("content_sha256") == digest:
+                    logger.info(
+                        f"⏭️ Identical transcription already in S3, skipping upload: "
+                        f"s3://{self.output_bucket}/{s3_key}"
+                    )
+                    return s3_key
+            except ClientError:
+                pass  # 未保存（404）など：通常どおりアップロード
 
             self.s3_client.put_object(
                 Bucket=self.output_bucket,
                 Key=s3_key,
-                Body=json.dumps(transcription_json, ensure_ascii=False, indent=2),
+                Body=body,
                 ContentType="application/json",
                 Metadata={
                     "transcription_engine": "gladia",
                     "original_job_id": result.get("id", ""),
                     "language": "ja",
+                    "content_sha256": digest,
                 },
             )
 
@@ -289,29 +468,170 @@ class GladiaTranscriber:
             # 3. 転写完了を待機
             result = self.wait_for_completion(job_id, result_url)
 
-            # 4. 結果をS3に保存
-            self.save_result_to_s3(result, file_id)
+            # 4-5. 結果をS3に保存し、DynamoDBを更新
+            self._finish_transcription(result, file_id)
+            return True
 
-            # 5. DynamoDBのtranscribedフラグを1に更新
-            success = self.dynamodb_client.update_transcribed_status(file_id, True)
-            if success:
-                logger.info(
-                    f"✅ DynamoDB transcribed flag updated to 1 for video: {file_id}"
-                )
-            else:
-                logger.warning(
-                    f"⚠️ Failed to update DynamoDB transcribed flag for video: {file_id}"
-                )
+        except Exception as e:
+            logger.error(f"❌ Transcription process failed for {file_id}: {e}")
+            return False
 
-            logger.info(
-                f"🎉 Transcription process completed successfully for: {file_id}"
+    async def process_transcription_async(
+        self, s3_bucket: str, s3_key: str, file_id: str
+    ) -> bool:
+        """
+        転写処理のメインフロー（async版：ブロッキング呼び出しはスレッドへ、待機はイベントループで）
+
+        Args:
+            s3_bucket: S3バケット名
+            s3_key: S3オブジェクトキー
+            file_id: ファイルID
+
+        Returns:
+            処理成功フラグ
+        """
+        try:
+            logger.info(f"🎬 Starting transcription process for: {file_id}")
+
+            audio_url = await asyncio.to_thread(
+                self.upload_audio_to_gladia, s3_bucket, s3_key
+            )
+            job_id, result_url = await asyncio.to_thread(
+                self.start_transcription, audio_url, file_id
             )
+            result = await self.wait_for_completion_async(job_id, result_url)
+            await asyncio.to_thread(self._finish_transcription, result, file_id)
             return True
 
         except Exception as e:
             logger.error(f"❌ Transcription process failed for {file_id}: {e}")
             return False
 
+    def _finish_transcription(self, result: Dict[str, Any], file_id: str):
+        """
+        転写結果をS3に保存し、DynamoDBのtranscribedフラグを1に更新
+
+        Args:
+            result: Gladiaの転写結果
+            file_id: ファイルID
+        """
+        self.save_result_to_s3(result, file_id)
+
+        success = self.dynamodb_client.update_transcribed_status(file_id, True)
+        if success:
+            logger.info(
+                f"✅ DynamoDB transcribed flag updated to 1 for video: {file_id}"
+            )
+        else:
+            logger.warning(
+                f"⚠️ Failed to update DynamoDB transcribed flag for video: {file_id}"
+            )
+
+        logger.info(f"🎉 Transcription process completed successfully for: {file_id}")
+
+
+def _message_target(message: Dict[str, Any]) -> Optional[tuple]:
+    """
+    SQSメッセージから転写対象を取り出す
+
+    Args:
+        message: SQSメッセージ
+
+    Returns:
+        (s3_bucket, s3_key, file_id)、不正なメッセージはNone
+    """
+    logger.info(f"📨 Received message: {message['MessageId']}")
+
+    try:
+        body = json.loads(message["Body"])
+    except Exception as e:
+        logger.error(f"❌ Error processing message: {e}")
+        return None
+
+    # S3ファイルパス取得
+    s3_bucket = body.get("detail", {}).get("bucket", {}).get("name")
+    s3_key = body.get("detail", {}).get("object", {}).get("key")
+
+    if not s3_bucket or not s3_key:
+        logger.error(f"❌ S3 path or bucket not found in SQS message: {body}")
+        return None
+
+    file_id = os.path.splitext(os.path.basename(s3_key))[0]
+    logger.info(f"🎵 Processing audio file: s3://{s3_bucket}/{s3_key}")
+    return s3_bucket, s3_key, file_id
+
+
+def _handle_message(transcriber: GladiaTranscriber, message: Dict[str, Any]) -> bool:
+    """
+    1件のSQSメッセージを処理（ワーカースレッドで実行）
+
+    Args:
+        transcriber: GladiaTranscriber（スレッド間で共有）
+        message: SQSメッセージ
+
+    Returns:
+        メッセージを削除してよいか（失敗時はFalseで可視性タイムアウト後に再処理）
+    """
+    target = _message_target(message)
+    if target is None:
+        # 再処理しても成功しないメッセージは削除する
+        return True
+
+    # Gladia転写処理を実行
+    success = transcriber.process_transcription(*target)
+    _log_result(target[2], success)
+    return success
+
+
+async def _handle_message_async(
+    transcriber: GladiaTranscriber, message: Dict[str, Any]
+) -> bool:
+    """
+    1件のSQSメッセージを処理（async版）
+
+    Args:
+        transcriber: GladiaTranscriber（タスク間で共有）
+        message: SQSメッセージ
+
+    Returns:
+        メッセージを削除してよいか
+    """
+    target = _message_target(message)
+    if target is None:
+        return True
+
+    success = await transcriber.process_transcription_async(*target)
+    _log_result(target[2], success)
+    return success
+
+
+def _log_result(file_id: str, success: bool):
+    """転写結果をログ出力"""
+    if success:
+        logger.info(f"✅ Successfully processed: {file_id}")
+    else:
+        logger.error(f"❌ Failed to process: {file_id}")
+
+
+def _delete_messages(sqs_client, queue_url: str, entries: List[Dict[str, str]]):
+    """
+    SQSメッセージをdelete_message_batchで10件ずつ削除
+
+    Args:
+        sqs_client: SQSクライアント
+        queue_url: SQSキューURL
+        entries: {"Id", "ReceiptHandle"} のリスト
+    """
+    for i in range(0, len(entries), 10):
+        response = sqs_client.delete_message_batch(
+            QueueUrl=queue_url, Entries=entries[i : i + 10]
+        )
+        for failed in response.get("Failed", []):
+            logger.error(f"❌ Failed to delete message {failed['Id']}: {failed}")
+        deleted = len(response.get("Successful", []))
+        if deleted:
+            logger.info(f"🗑️ {deleted} message(s) deleted from SQS")
+
 
 def main():
     """メイン処理：SQSからメッセージを受信してGladia転写を実行"""
@@ -322,71 +642,132 @@ def main():
         if not sqs_queue_url:
             raise ValueError("SQS_QUEUE_URL環境変数が設定されていません")
 
-        logger.info(f"🚀 Gladia Transcription Worker started")
-        logger.info(f"📋 SQS Queue URL: {sqs_queue_url}")
+        # 同時に処理するメッセージ数（アップロード・ポーリングはI/O待ちのためスレッドで並行）
+        workers = int(os.getenv("GLADIA_WORKERS", "8"))
 
-        # SQSからメッセージを受信してTranscribeを実行
-        while True:
-            try:
-                response = transcriber.sqs_client.receive_message(
-                    QueueUrl=sqs_queue_url, MaxNumberOfMessages=1, WaitTimeSeconds=10
-                )
-
-                messages = response.get("Messages", [])
-                if not messages:
-                    logger.info("⏳ No messages in SQS queue. Waiting...")
-                    continue
+        logger.info(f"🚀 Gladia Transcription Worker started ({workers} workers)")
+        logger.info(f"📋 SQS Queue URL: {sqs_queue_url}")
 
-                message = messages[0]
-                logger.info(f"📨 Received message: {message['MessageId']}")
+        # 処理中のメッセージ（future -> message）
+        in_flight = {}
 
+        # SQSからメッセージを受信してTranscribeを実行
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
                 try:
-                    body = json.loads(message["Body"])
-
-                    # S3ファイルパス取得
-                    s3_bucket = body.get("detail", {}).get("bucket", {}).get("name")
-                    s3_key = body.get("detail", {}).get("object", {}).get("key")
+                    # 空きワーカーがなければいずれかの完了を待つ
+                    if len(in_flight) >= workers:
+                        wait(in_flight, return_when=FIRST_COMPLETED)
+
+                    # 完了したメッセージをまとめて削除
+                    entries = []
+                    for future in [f for f in in_flight if f.done()]:
+                        message = in_flight.pop(future)
+                        if future.result():
+                            entries.append(
+                                {
+                                    "Id": message["MessageId"],
+                                    "ReceiptHandle": message["ReceiptHandle"],
+                                }
+                            )
+                    _delete_messages(transcriber.sqs_client, sqs_queue_url, entries)
+
+                    # 空きワーカー数だけ受信（処理待ちで可視性タイムアウトを消費しない）
+                    response = transcriber.sqs_client.receive_message(
+                        QueueUrl=sqs_queue_url,
+                        MaxNumberOfMessages=min(10, workers - len(in_flight)),
+                        WaitTimeSeconds=20,
+                    )
 
-                    if not s3_bucket or not s3_key:
-                        logger.error(
-                            f"❌ S3 path or bucket not found in SQS message: {body}"
-                        )
+                    messages = response.get("Messages", [])
+                    if not messages:
+                        if not in_flight:
+                            logger.info("⏳ No messages in SQS queue. Waiting...")
                         continue
 
-                    file_id = os.path.splitext(os.path.basename(s3_key))[0]
-                    logger.info(f"🎵 Processing audio file: s3://{s3_bucket}/{s3_key}")
-
-                    # Gladia転写処理を実行
-                    success = transcriber.process_transcription(
-                        s3_bucket, s3_key, file_id
-                    )
-
-                    if success:
-                        logger.info(f"✅ Successfully processed: {file_id}")
-                    else:
-                        logger.error(f"❌ Failed to process: {file_id}")
+                    for message in messages:
+                        future = executor.submit(_handle_message, transcriber, message)
+                        in_flight[future] = message
 
+                except KeyboardInterrupt:
+                    logger.info("🛑 Interrupted by user. Shutting down...")
+                    break
                 except Exception as e:
-                    logger.error(f"❌ Error processing message: {e}")
+                    logger.error(f"❌ Unexpected error in main loop: {e}")
+                    time.sleep(5)  # エラー時は5秒待機
 
-                finally:
-                    # SQSメッセージを削除
-                    transcriber.sqs_client.delete_message(
-                        QueueUrl=sqs_queue_url, ReceiptHandle=message["ReceiptHandle"]
-                    )
-                    logger.info(f"🗑️ Message deleted from SQS")
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize Gladia transcriber: {e}")
+        return
 
-            except KeyboardInterrupt:
-                logger.info("🛑 Interrupted by user. Shutting down...")
-                break
-            except Exception as e:
-                logger.error(f"❌ Unexpected error in main loop: {e}")
-                time.sleep(5)  # エラー時は5秒待機
 
+async def main_async():
+    """メイン処理（async版）：1つのイベントループで多数の転写を並行して監視"""
+    try:
+        transcriber = GladiaTranscriber()
+
+        sqs_queue_url = os.getenv("SQS_QUEUE_URL")
+        if not sqs_queue_url:
+            raise ValueError("SQS_QUEUE_URL環境変数が設定されていません")
     except Exception as e:
         logger.error(f"❌ Failed to initialize Gladia transcriber: {e}")
         return
 
+    # 同時に処理するメッセージ数（ポーリング待機はスレッドを占有しないため多めに取れる）
+    max_in_flight = int(os.getenv("GLADIA_MAX_IN_FLIGHT", "100"))
+
+    logger.info(f"🚀 Gladia Transcription Worker started (async, {max_in_flight} jobs)")
+    logger.info(f"📋 SQS Queue URL: {sqs_queue_url}")
+
+    async def run(message: Dict[str, Any]):
+        # タスク内の例外は誰にもawaitされず消えるため、ここでログに残す
+        try:
+            if await _handle_message_async(transcriber, message):
+                entry = {
+                    "Id": message["MessageId"],
+                    "ReceiptHandle": message["ReceiptHandle"],
+                }
+                await asyncio.to_thread(
+                    _delete_messages, transcriber.sqs_client, sqs_queue_url, [entry]
+                )
+        except Exception as e:
+            logger.error(f"❌ Error processing message {message.get('MessageId')}: {e}")
+
+    in_flight = set()
+    while True:
+        try:
+            # 上限に達していればいずれかの完了を待つ
+            if len(in_flight) >= max_in_flight:
+                await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                continue
+
+            response = await asyncio.to_thread(
+                transcriber.sqs_client.receive_message,
+                QueueUrl=sqs_queue_url,
+                MaxNumberOfMessages=min(10, max_in_flight - len(in_flight)),
+                WaitTimeSeconds=20,
+            )
+
+            messages = response.get("Messages", [])
+            if not messages and not in_flight:
+                logger.info("⏳ No messages in SQS queue. Waiting...")
+
+            for message in messages:
+                task = asyncio.create_task(run(message))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+
+        except Exception as e:
+            logger.error(f"❌ Unexpected error in main loop: {e}")
+            await asyncio.sleep(5)  # エラー時は5秒待機
+
 
 if __name__ == "__main__":
-    main()
+    # GLADIA_ASYNC=true でasync版のワーカーを使用
+    if os.getenv("GLADIA_ASYNC", "false").lower() == "true":
+        try:
+            asyncio.run(main_async())
+        except KeyboardInterrupt:
+            logger.info("🛑 Interrupted by user. Shutting down...")
+    else:
+        main()
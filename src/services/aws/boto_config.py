@@ -0,0 +1,25 @@
+"""
+boto3クライアント共通設定
+
+S3/SQS/Transcribeを使う各モジュールはここのConfigを使い、
+リトライ・接続プール・Transfer Accelerationの設定がずれないようにする
+"""
+
+import os
+
+from botocore.config import Config
+
+# boto3クライアント共通設定（keep-alive、接続プール拡大、アダプティブリトライ）
+# S3_ACCELERATE=1 でS3 Transfer Accelerationのエンドポイントを使用
+# （バケット側でTransfer Accelerationを有効化しておくこと。リージョン外からの転送向け）
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    retries={"max_attempts": 5, "mode": "adaptive"},
+    connect_timeout=5,
+    read_timeout=60,
+    s3={
+        "use_accelerate_endpoint": os.getenv("S3_ACCELERATE", "0") == "1",
+        "addressing_style": "virtual",
+    },
+)
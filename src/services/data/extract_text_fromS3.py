@@ -1,10 +1,30 @@
 import boto3
+from botocore.exceptions import ClientError
 import json
 import logging
 import os
-from typing import Dict, List, Optional, Any
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
+try:
+    import orjson  # C実装の高速JSON（bytesを直接パース/出力）
+except ImportError:
+    orjson = None
+
+try:
+    import ijson  # ストリーミングJSONパーサー（本文全体を読み込まずにパース）
+except ImportError:
+    ijson = None
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from services.aws.boto_config import BOTO_CONFIG
+
 # ログ設定
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -14,20 +34,86 @@ logger = logging.getLogger(__name__)
 # 環境変数を読み込み
 load_dotenv()
 
+# S3_SELECT_ENABLED=1 でTranscribe結果のfull_transcriptをS3 Selectで取得する
+# （S3 Selectは新規アカウントでは利用できないため既定は無効。無効時はijsonで
+# ストリーミング抽出する）
+S3_SELECT_ENABLED = os.getenv("S3_SELECT_ENABLED", "0") == "1"
+
+# batch_extract_texts で同時に取得するファイル数（max_pool_connections以下にする）
+BATCH_EXTRACT_WORKERS = 32
+
+# read_json_from_s3 のキャッシュ（ETagで変更を確認、TTL経過後は再取得）
+# 同じキーを繰り返し読む用途向けのオプトイン機能。上限は生JSONの合計バイト数
+# （既定0 = 無効。各キーを1回ずつ読むバッチ処理ではメモリを使うだけのため）
+JSON_CACHE_TTL_SECONDS = 3600
+JSON_CACHE_MAX_BYTES = int(os.getenv("S3_JSON_CACHE_MAX_BYTES", "0"))
+
+# 汎用抽出の既定テキストフィールド名
+DEFAULT_TEXT_FIELDS = (
+    "text",
+    "content",
+    "message",
+    "description",
+    "transcript",
+    "body",
+)
+# 既定フィールドの文字列値をJSONのバイト列から直接拾う（json.loadsとツリー走査を省略）
+# extraction_type='generic_bytes' を明示した場合のみ使用（fieldはパスではなくフィールド名）
+_TEXT_FIELD_RE = re.compile(
+    rb'"('
+    + b"|".join(f.encode() for f in DEFAULT_TEXT_FIELDS)
+    + rb')"\s*:\s*"((?:[^"\\]|\\.)*)"',
+    re.IGNORECASE,
+)
+
 
 class S3JsonTextExtractor:
     """S3からJSONファイルを読み込んでテキストを抽出するクラス"""
 
-    def __init__(self):
-        """初期化 - AWS認証情報を設定"""
+    def __init__(self, json_cache_max_bytes: int = JSON_CACHE_MAX_BYTES):
+        """
+        初期化 - AWS認証情報を設定
+
+        Args:
+            json_cache_max_bytes: read_json_from_s3 のキャッシュ上限（生JSONのバイト数、0で無効）
+        """
         self.s3_client = boto3.client(
             "s3",
             aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
             aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
             region_name=os.getenv("AWS_REGION"),
+            config=BOTO_CONFIG,
         )
         logger.info("S3クライアントを初期化しました")
 
+        # (bucket, key) -> (ETag, 生JSONバイト列, 取得時刻) のLRUキャッシュ
+        # 解析済みの辞書ではなくバイト列を保持し、呼び出しごとに新しい辞書を返す
+        self._json_cache_max_bytes = json_cache_max_bytes
+        self._json_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._json_cache_bytes = 0
+        self._json_cache_lock = threading.Lock()
+
+    @staticmethod
+    def _parse_json_bytes(raw: bytes) -> Dict:
+        """JSONバイト列をパース（orjsonがあれば使用）"""
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw.decode("utf-8"))
+
+    def _cache_json(self, cache_key: tuple, etag: str, raw: bytes):
+        """生JSONをキャッシュに追加し、合計バイト数が上限を超えたら古い順に削除"""
+        if len(raw) > self._json_cache_max_bytes:
+            return
+        with self._json_cache_lock:
+            old = self._json_cache.pop(cache_key, None)
+            if old:
+                self._json_cache_bytes -= len(old[1])
+            self._json_cache[cache_key] = (etag, raw, time.monotonic())
+            self._json_cache_bytes += len(raw)
+            while self._json_cache_bytes > self._json_cache_max_bytes:
+                _, (_, evicted, _) = self._json_cache.popitem(last=False)
+                self._json_cache_bytes -= len(evicted)
+
     def read_json_from_s3(self, bucket_name: str, object_key: str) -> Optional[Dict]:
         """
         S3からJSONファイルを読み込む
@@ -37,21 +123,54 @@ class S3JsonTextExtractor:
             object_key: オブジェクトキー（ファイルパス）
 
         Returns:
-            JSONデータ（辞書形式）、失敗時はNone
+            JSONデータ（辞書形式、呼び出しごとに新しいオブジェクト）、失敗時はNone
         """
         try:
             logger.info(
                 f"S3からJSONファイルを読み込み中: s3://{bucket_name}/{object_key}"
             )
 
-            response = self.s3_client.get_object(Bucket=bucket_name, Key=object_key)
-            json_content = response["Body"].read().decode("utf-8")
-
-            data = json.loads(json_content)
+            cache_key = (bucket_name, object_key)
+            cached = None
+            if self._json_cache_max_bytes > 0:
+                with self._json_cache_lock:
+                    cached = self._json_cache.get(cache_key)
+                    if cached and time.monotonic() - cached[2] > JSON_CACHE_TTL_SECONDS:
+                        del self._json_cache[cache_key]
+                        self._json_cache_bytes -= len(cached[1])
+                        cached = None
+
+            # キャッシュがあればIfNoneMatchで条件付きGET（未変更なら304で本文なし）
+            get_kwargs = {"Bucket": bucket_name, "Key": object_key}
+            if cached:
+                get_kwargs["IfNoneMatch"] = cached[0]
+            try:
+                response = self.s3_client.get_object(**get_kwargs)
+            except ClientError as e:
+                if cached and e.response["Error"]["Code"] in ("304", "NotModified"):
+                    logger.info("JSONファイルは未変更のためキャッシュを使用します")
+                    with self._json_cache_lock:
+                        if cache_key in self._json_cache:
+                            self._json_cache.move_to_end(cache_key)
+                    return self._parse_json_bytes(cached[1])
+                raise
+
+            if self._json_cache_max_bytes > 0:
+                json_content = response["Body"].read()
+                data = self._parse_json_bytes(json_content)
+                self._cache_json(cache_key, response["ETag"], json_content)
+            elif orjson is not None:
+                json_content = response["Body"].read()
+                data = orjson.loads(json_content)
+            elif ijson is not None:
+                # ダウンロードしながらバイト列をそのままパース（str変換なし）
+                data = next(ijson.items(response["Body"], "", use_float=True))
+            else:
+                json_content = response["Body"].read()
+                data = json.loads(json_content.decode("utf-8"))
             logger.info(
-                f"JSONファイルの読み込みが完了しました: {len(json_content)} bytes"
+                f"JSONファイルの読み込みが完了しました: {response['ContentLength']} bytes"
             )
-
             return data
 
         except Exception as e:
@@ -91,6 +210,95 @@ class S3JsonTextExtractor:
             logger.error(f"Transcribeテキストの抽出に失敗しました: {e}")
             return None
 
+    def extract_full_transcript_s3_select(
+        self, bucket_name: str, object_key: str
+    ) -> Optional[str]:
+        """
+        S3 Selectでfull_transcriptだけをサーバー側で抽出（JSON全体を転送・パースしない）
+
+        Args:
+            bucket_name: S3バケット名
+            object_key: オブジェクトキー
+
+        Returns:
+            抽出されたテキスト（空文字も確定結果）、取得できない場合はNone
+            （呼び出し側で通常読み込みに切り替え）
+        """
+        try:
+            response = self.s3_client.select_object_content(
+                Bucket=bucket_name,
+                Key=object_key,
+                Expression="SELECT s.result.transcription.full_transcript FROM S3Object s",
+                ExpressionType="SQL",
+                InputSerialization={"JSON": {"Type": "DOCUMENT"}},
+                OutputSerialization={"JSON": {}},
+            )
+
+            payload = b"".join(
+                event["Records"]["Payload"]
+                for event in response["Payload"]
+                if "Records" in event
+            )
+            if not payload.strip():
+                return None
+
+            # 出力は {"full_transcript": "..."} の1レコード
+            record = (
+                orjson.loads(payload)
+                if orjson is not None
+                else json.loads(payload.decode("utf-8"))
+            )
+            full_text = record.get("full_transcript")
+            if not isinstance(full_text, str):
+                return None
+
+            logger.info(f"S3 Selectでテキストを抽出しました: {len(full_text)} 文字")
+            return full_text
+
+        except Exception as e:
+            # S3 Select非対応のバケット・レコードサイズ超過など
+            logger.warning(
+                f"S3 Selectでの抽出に失敗しました（通常読み込みに切替）: {e}"
+            )
+            return None
+
+    def extract_full_transcript_stream(
+        self, bucket_name: str, object_key: str
+    ) -> Optional[str]:
+        """
+        ijsonでfull_transcriptだけをストリーミング抽出（辞書全体を作らない）
+
+        Args:
+            bucket_name: S3バケット名
+            object_key: オブジェクトキー
+
+        Returns:
+            抽出されたテキスト、取得できない場合はNone
+        """
+        if ijson is None:
+            return None
+
+        try:
+            response = self.s3_client.get_object(Bucket=bucket_name, Key=object_key)
+            body = response["Body"]
+            try:
+                for full_text in ijson.items(
+                    body, "result.transcription.full_transcript"
+                ):
+                    if isinstance(full_text, str):
+                        logger.info(
+                            f"ストリーミングでテキストを抽出しました: {len(full_text)} 文字"
+                        )
+                        return full_text
+            finally:
+                # 残りの本文は読まずに接続を閉じる
+                body.close()
+            return None
+
+        except Exception as e:
+            logger.warning(f"ストリーミングでの抽出に失敗しました: {e}")
+            return None
+
     def extract_text_generic(
         self, json_data: Dict, text_fields: List[str] = None
     ) -> List[str]:
@@ -106,43 +314,112 @@ class S3JsonTextExtractor:
         """
         if text_fields is None:
             # 一般的なテキストフィールド名
-            text_fields = [
-                "text",
-                "content",
-                "message",
-                "description",
-                "transcript",
-                "body",
-            ]
+            text_fields = DEFAULT_TEXT_FIELDS
 
         extracted_texts = []
+        # 小文字化したフィールド名は一度だけ作成（キー毎のリスト生成を避ける）
+        text_fields_lower = frozenset(field.lower() for field in text_fields)
+
+        try:
+            # 明示的なスタックで深さ優先探索（再帰と同じ順序、深いJSONでも
+            # RecursionErrorにならない）。要素は (キーが対象フィールドか, 値, パス)
+            stack = deque([(False, json_data, "")])
+            while stack:
+                is_text_field, obj, current_path = stack.pop()
+
+                if isinstance(obj, dict):
+                    # 先頭の要素から処理されるよう逆順に積む
+                    for key, value in reversed(obj.items()):
+                        new_path = f"{current_path}.{key}" if current_path else key
+                        stack.append(
+                            (key.lower() in text_fields_lower, value, new_path)
+                        )
+
+                elif isinstance(obj, list):
+                    for i in range(len(obj) - 1, -1, -1):
+                        new_path = f"{current_path}[{i}]" if current_path else f"[{i}]"
+                        stack.append((False, obj[i], new_path))
+
+                # テキストフィールドかチェック
+                elif is_text_field and isinstance(obj, str) and obj.strip():
+                    extracted_texts.append({"field": current_path, "text": obj.strip()})
+                    logger.debug(f"テキストを発見: {current_path} = {obj[:50]}...")
+
+            logger.info(
+                f"汎用テキスト抽出が完了: {len(extracted_texts)} 個のテキストフィールドを発見"
+            )
+            return extracted_texts
+
+        except Exception as e:
+            logger.error(f"汎用テキスト抽出に失敗しました: {e}")
+            return []
+
+    def _stream_extract(self, body_stream, text_fields_lower: frozenset) -> List[Dict]:
+        """
+        ijsonのイベントを1回だけ消費してテキストを抽出（辞書を作らない）
+
+        extract_text_generic と同じ順序・同じパス表記で結果を返す。
 
-        def search_text_recursive(obj: Any, current_path: str = ""):
-            """再帰的にJSONからテキストを検索"""
-            if isinstance(obj, dict):
-                for key, value in obj.items():
-                    new_path = f"{current_path}.{key}" if current_path else key
-
-                    # テキストフィールドかチェック
-                    if key.lower() in [field.lower() for field in text_fields]:
-                        if isinstance(value, str) and value.strip():
-                            extracted_texts.append(
-                                {"field": new_path, "text": value.strip()}
-                            )
-                            logger.debug(
-                                f"テキストを発見: {new_path} = {value[:50]}..."
-                            )
-
-                    # 再帰的に検索
-                    search_text_recursive(value, new_path)
-
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    new_path = f"{current_path}[{i}]" if current_path else f"[{i}]"
-                    search_text_recursive(item, new_path)
+        Args:
+            body_stream: JSONのバイトストリーム（S3のStreamingBody等）
+            text_fields_lower: 小文字化した抽出対象フィールド名
 
+        Returns:
+            抽出されたテキストのリスト
+        """
+        extracted_texts = []
+        # 開いているコンテナ: [パス, 配列か, 配列の次のインデックス or 直前のキー]
+        stack = []
+
+        for event, value in ijson.basic_parse(body_stream):
+            if event == "map_key":
+                stack[-1][2] = value
+                continue
+            if event in ("end_map", "end_array"):
+                stack.pop()
+                continue
+
+            # 値の開始：親コンテナからパスを求める
+            is_text_field = False
+            if not stack:
+                path = ""
+            else:
+                parent_path, is_array, slot = stack[-1]
+                if is_array:
+                    path = f"{parent_path}[{slot}]"
+                    stack[-1][2] = slot + 1
+                else:
+                    path = f"{parent_path}.{slot}" if parent_path else slot
+                    is_text_field = slot.lower() in text_fields_lower
+
+            if event == "start_map":
+                stack.append([path, False, None])
+            elif event == "start_array":
+                stack.append([path, True, 0])
+            elif is_text_field and event == "string" and value.strip():
+                extracted_texts.append({"field": path, "text": value.strip()})
+
+        return extracted_texts
+
+    def extract_text_generic_bytes(self, raw_json: bytes) -> List[Dict]:
+        """
+        既定テキストフィールドの値をJSONバイト列から正規表現で抽出（パースしない）
+
+        Args:
+            raw_json: UTF-8のJSONバイト列
+
+        Returns:
+            抽出されたテキストのリスト（fieldはパスではなくフィールド名）
+        """
+        extracted_texts = []
         try:
-            search_text_recursive(json_data)
+            for match in _TEXT_FIELD_RE.finditer(raw_json):
+                # JSON文字列としてエスケープ（\uXXXX等）を解除
+                value = json.loads(b'"' + match.group(2) + b'"')
+                if value.strip():
+                    extracted_texts.append(
+                        {"field": match.group(1).decode("utf-8"), "text": value.strip()}
+                    )
             logger.info(
                 f"汎用テキスト抽出が完了: {len(extracted_texts)} 個のテキストフィールドを発見"
             )
@@ -161,11 +438,59 @@ class S3JsonTextExtractor:
         Args:
             bucket_name: S3バケット名
             object_key: オブジェクトキー
-            extraction_type: 抽出タイプ ('auto', 'transcribe', 'generic')
+            extraction_type: 抽出タイプ ('auto', 'transcribe', 'generic', 'generic_bytes')
+                'generic_bytes' は正規表現でバイト列を走査する高速版。
+                fieldはJSONパスではなくフィールド名になる
 
         Returns:
             抽出結果の辞書
         """
+        if extraction_type == "transcribe":
+            # 必要なのはfull_transcriptのみなので、S3 Select（有効時）か
+            # ストリーミングで取得を試みる
+            text = None
+            if S3_SELECT_ENABLED:
+                text = self.extract_full_transcript_s3_select(bucket_name, object_key)
+            if text is None:
+                text = self.extract_full_transcript_stream(bucket_name, object_key)
+            # 空文字も確定結果として扱う（全体の再取得はしない）
+            if text is not None:
+                extracted = [{"field": "transcript", "text": text}] if text else []
+                logger.info(f"テキスト抽出完了: {len(extracted)} 個のテキストを抽出")
+                return {
+                    "source": f"s3://{bucket_name}/{object_key}",
+                    "extraction_type": extraction_type,
+                    "extracted_texts": extracted,
+                }
+
+        if extraction_type == "generic_bytes" or (
+            extraction_type == "generic" and ijson is not None
+        ):
+            # 取得・パース・抽出を1パスで行う（ijsonがなければ下の通常読み込みで
+            # extract_text_generic を使い、fieldの形式（JSONパス）を揃える）
+            try:
+                response = self.s3_client.get_object(Bucket=bucket_name, Key=object_key)
+                if extraction_type == "generic_bytes":
+                    texts = self.extract_text_generic_bytes(response["Body"].read())
+                else:
+                    with response["Body"] as body:
+                        texts = self._stream_extract(
+                            body, frozenset(f.lower() for f in DEFAULT_TEXT_FIELDS)
+                        )
+                    logger.info(
+                        f"汎用テキスト抽出が完了: {len(texts)} 個のテキストフィールドを発見"
+                    )
+            except Exception as e:
+                logger.error(f"JSONファイルの読み込みに失敗しました: {e}")
+                return None
+
+            logger.info(f"テキスト抽出完了: {len(texts)} 個のテキストを抽出")
+            return {
+                "source": f"s3://{bucket_name}/{object_key}",
+                "extraction_type": extraction_type,
+                "extracted_texts": texts,
+            }
+
         # JSONファイルを読み込み
         json_data = self.read_json_from_s3(bucket_name, object_key)
         if json_data is None:
@@ -203,8 +528,32 @@ class S3JsonTextExtractor:
 
         return result
 
+    def _list_json_keys(
+        self, bucket_name: str, prefix: str, start_after: str = ""
+    ) -> List[str]:
+        """1つのプレフィックス配下のJSONキーを列挙（1000件/ページ）"""
+        paginate_kwargs = {
+            "Bucket": bucket_name,
+            "Prefix": prefix,
+            "PaginationConfig": {"PageSize": 1000},
+        }
+        if start_after:
+            paginate_kwargs["StartAfter"] = start_after
+
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        return [
+            obj["Key"]
+            for page in paginator.paginate(**paginate_kwargs)
+            for obj in page.get("Contents", [])
+            if obj["Key"][-5:].lower() == ".json"
+        ]
+
     def list_json_files_in_bucket(
-        self, bucket_name: str, prefix: str = ""
+        self,
+        bucket_name: str,
+        prefix: str = "",
+        shard_chars: Optional[str] = None,
+        start_after: str = "",
     ) -> List[str]:
         """
         S3バケット内のJSONファイル一覧を取得
@@ -212,6 +561,9 @@ class S3JsonTextExtractor:
         Args:
             bucket_name: S3バケット名
             prefix: プレフィックス（フォルダパス）
+            shard_chars: prefix直後の1文字として取りうる文字の集合。指定すると
+                prefix+文字ごとに並行して列挙する（全キーがこの文字で始まる場合のみ）
+            start_after: このキーより後から列挙（中断した列挙の再開用）
 
         Returns:
             JSONファイルのキーリスト
@@ -219,16 +571,18 @@ class S3JsonTextExtractor:
         try:
             logger.info(f"S3バケット内のJSONファイルを検索中: {bucket_name}/{prefix}")
 
-            paginator = self.s3_client.get_paginator("list_objects_v2")
-            pages = paginator.paginate(Bucket=bucket_name, Prefix=prefix)
-
-            json_files = []
-            for page in pages:
-                if "Contents" in page:
-                    for obj in page["Contents"]:
-                        key = obj["Key"]
-                        if key.lower().endswith(".json"):
-                            json_files.append(key)
+            if shard_chars:
+                prefixes = [prefix + c for c in sorted(set(shard_chars))]
+                with ThreadPoolExecutor(
+                    max_workers=min(len(prefixes), BATCH_EXTRACT_WORKERS)
+                ) as executor:
+                    shards = executor.map(
+                        lambda p: self._list_json_keys(bucket_name, p, start_after),
+                        prefixes,
+                    )
+                    json_files = [key for keys in shards for key in keys]
+            else:
+                json_files = self._list_json_keys(bucket_name, prefix, start_after)
 
             logger.info(f"JSONファイルを {len(json_files)} 個発見しました")
             return json_files
@@ -252,15 +606,16 @@ class S3JsonTextExtractor:
             抽出結果のリスト
         """
         json_files = self.list_json_files_in_bucket(bucket_name, prefix)
-        results = []
 
-        for json_file in json_files:
+        def extract(json_file: str) -> Optional[Dict]:
             logger.info(f"処理中: {json_file}")
-            result = self.extract_text_from_s3_json(
+            return self.extract_text_from_s3_json(
                 bucket_name, json_file, extraction_type
             )
-            if result:
-                results.append(result)
+
+        # S3 GETのレイテンシを重ねるためスレッドで並行取得（mapで順序は維持）
+        with ThreadPoolExecutor(max_workers=BATCH_EXTRACT_WORKERS) as executor:
+            results = [result for result in executor.map(extract, json_files) if result]
 
         logger.info(f"バッチ処理完了: {len(results)} ファイルを処理しました")
         return results
@@ -5,14 +5,101 @@ Handles interactions with DynamoDB for YouTube video data management
 
 import boto3
 import logging
+import os
 import re
 import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
-from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.conditions import Attr, Key
 from botocore.exceptions import ClientError
 
+try:
+    # PyICU: NFKC + case folding in a single native pass
+    from icu import Normalizer2
+
+    _NFKC_CF = Normalizer2.getNFKCCasefoldInstance()
+except ImportError:
+    _NFKC_CF = None
+
+# Number of parallel segments for full-table COUNT scans
+SCAN_TOTAL_SEGMENTS = 8
+
+# Name of the GSI keyed on the numeric transcribed flag (HASH: transcribed, 0/1),
+# projecting ALL attributes (listings read every VideoRecord field from it).
+# When unset, transcribed filtering falls back to scans.
+TRANSCRIBED_INDEX_NAME = os.getenv("YOUTUBE_TRANSCRIBED_INDEX")
+
+# Attributes returned by list/search scans (the VideoRecord fields); every name
+# goes through a placeholder since several are DynamoDB reserved words
+VIDEO_ATTRIBUTES = (
+    "video_id",
+    "title",
+    "author",
+    "duration",
+    "views",
+    "description",
+    "url",
+    "transcribed",
+    "created_at",
+    "updated_at",
+)
+_PROJECTION_EXPRESSION = ", ".join(f"#{name}" for name in VIDEO_ATTRIBUTES)
+
+# Updates per TransactWriteItems request in batch_update_transcribed_status
+TRANSACT_BATCH_SIZE = 25
+
+# Hiragana (U+3040-U+309F) -> Katakana (U+30A0-U+30FF) translation table
+_HIRA_TO_KATA = {code: code + 0x60 for code in range(0x3040, 0x30A0)}
+_WS_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def _normalize_text_for_search(text: str) -> str:
+    """
+    Normalize text for search by:
+    1. Converting to lowercase
+    2. Converting hiragana to katakana
+    3. Normalizing unicode
+    4. Removing extra whitespace
+
+    Cached because the same titles/authors and search terms recur across searches.
+    """
+    if not text:
+        return ""
+
+    if _NFKC_CF is not None:
+        # Lowercase (case fold) and normalize unicode in one pass
+        text = _NFKC_CF.normalize(text)
+    else:
+        # Convert to lowercase
+        text = text.lower()
+
+        # Normalize unicode
+        text = unicodedata.normalize("NFKC", text)
+
+    # Convert hiragana to katakana
+    normalized = text.translate(_HIRA_TO_KATA)
+
+    # Remove extra whitespace
+    return _WS_RE.sub(" ", normalized).strip()
+
+
+@lru_cache(maxsize=64)
+def _build_update_expression(keys: Tuple[str, ...]) -> Tuple[str, Dict[str, str]]:
+    """Build "SET #k = :k, ..." and its attribute-name map for a set of keys"""
+    update_expression = "SET " + ", ".join(f"#{key} = :{key}" for key in keys)
+    expression_attribute_names = {f"#{key}": key for key in keys}
+    return update_expression, expression_attribute_names
+
+
+@lru_cache(maxsize=2048)
+def _parse_iso(value: str) -> datetime:
+    """Parse an ISO timestamp; cached since items written together share values"""
+    return datetime.fromisoformat(value)
+
 
 @dataclass
 class VideoRecord:
@@ -53,20 +140,27 @@ class VideoRecord:
         }
 
     @classmethod
-    def from_dynamodb_item(cls, item: Dict[str, Any]) -> "VideoRecord":
-        """Create VideoRecord from DynamoDB item"""
+    def from_dynamodb_item(
+        cls, item: Dict[str, Any], now: Optional[datetime] = None
+    ) -> "VideoRecord":
+        """Create VideoRecord from DynamoDB item
+
+        now: fallback for missing/invalid timestamps (resolved once if omitted)
+        """
+        if now is None:
+            now = datetime.now()
 
         # Helper function to parse datetime from string or return datetime object
         def parse_datetime(value):
             if isinstance(value, str):
                 try:
-                    return datetime.fromisoformat(value)
+                    return _parse_iso(value)
                 except ValueError:
-                    return datetime.now()
+                    return now
             elif isinstance(value, datetime):
                 return value
             else:
-                return datetime.now()
+                return now
 
         return cls(
             video_id=item.get("video_id", ""),
@@ -79,65 +173,108 @@ class VideoRecord:
             transcribed=bool(
                 int(item.get("transcribed", 0))
             ),  # Convert number to boolean
-            created_at=parse_datetime(item.get("created_at", datetime.now())),
-            updated_at=parse_datetime(item.get("updated_at", datetime.now())),
+            created_at=parse_datetime(item.get("created_at")),
+            updated_at=parse_datetime(item.get("updated_at")),
         )
 
+    @staticmethod
+    def item_to_api_dict(
+        item: Dict[str, Any], now_iso: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the API dict directly from a DynamoDB item
+
+        Same output as from_dynamodb_item(item).to_dict() without the dataclass
+        round-trip; missing/invalid timestamps share one now_iso per call site.
+        """
+        if now_iso is None:
+            now_iso = datetime.now().isoformat()
+
+        def iso(value):
+            if isinstance(value, str):
+                try:
+                    return _parse_iso(value).isoformat()
+                except ValueError:
+                    return now_iso
+            if isinstance(value, datetime):
+                return value.isoformat()
+            return now_iso
+
+        get = item.get
+        return {
+            "video_id": get("video_id", ""),
+            "title": get("title", ""),
+            "author": get("author", ""),
+            "duration": get("duration", ""),
+            "views": int(get("views", 0)),
+            "description": get("description", ""),
+            "url": get("url", ""),
+            "transcribed": bool(int(get("transcribed", 0))),
+            "created_at": iso(get("created_at")),
+            "updated_at": iso(get("updated_at")),
+        }
+
 
 class YouTubeDynamoDBClient:
     """DynamoDB client for YouTube video data management"""
 
-    def __init__(self, table_name: str):
-        """Initialize DynamoDB client"""
+    def __init__(
+        self,
+        table_name: str,
+        transcribed_index: Optional[str] = TRANSCRIBED_INDEX_NAME,
+        search_index=None,
+    ):
+        """Initialize DynamoDB client
+
+        search_index: optional YouTubeSearchIndex; when given, search_videos
+        queries it instead of scanning the table.
+        """
         self.table_name = table_name
         self.dynamodb = boto3.resource("dynamodb")
         self.table = self.dynamodb.Table(table_name)
+        self.transcribed_index = transcribed_index
+        self.search_index = search_index
         self.logger = logging.getLogger(__name__)
 
-    @staticmethod
-    def normalize_text_for_search(text: str) -> str:
-        """
-        Normalize text for search by:
-        1. Converting to lowercase
-        2. Converting hiragana to katakana
-        3. Normalizing unicode
-        4. Removing extra whitespace
-        """
-        if not text:
-            return ""
-
-        # Convert to lowercase
-        text = text.lower()
-
-        # Normalize unicode
-        text = unicodedata.normalize("NFKC", text)
+    normalize_text_for_search = staticmethod(_normalize_text_for_search)
 
-        # Convert hiragana to katakana
-        normalized = ""
-        for char in text:
-            # Hiragana range: U+3040-U+309F
-            # Katakana range: U+30A0-U+30FF
-            code = ord(char)
-            if 0x3040 <= code <= 0x309F:
-                # Convert hiragana to katakana
-                normalized += chr(code + 0x60)
-            else:
-                normalized += char
+    def _text_contains_normalized(
+        self, haystack: str, needle: str, normalized_needle: str
+    ) -> bool:
+        """Check if haystack contains needle using normalized text comparison
 
-        # Remove extra whitespace
-        normalized = re.sub(r"\s+", " ", normalized).strip()
+        normalized_needle is the needle already passed through
+        normalize_text_for_search (computed once per search).
+        """
+        if not haystack:
+            return False
 
-        return normalized
+        # Raw substring hit (common for ASCII titles) needs no normalization
+        if needle in haystack:
+            return True
 
-    def _text_contains_normalized(self, haystack: str, needle: str) -> bool:
-        """Check if haystack contains needle using normalized text comparison"""
-        if not needle or not haystack:
-            return False
+        return normalized_needle in self.normalize_text_for_search(haystack)
 
-        normalized_haystack = self.normalize_text_for_search(haystack)
-        normalized_needle = self.normalize_text_for_search(needle)
+    @staticmethod
+    def _projection_kwargs() -> Dict[str, Any]:
+        """ProjectionExpression limiting scans to the VideoRecord attributes"""
+        # boto3 merges generated filter placeholders into this dict, so build it per call
+        return {
+            "ProjectionExpression": _PROJECTION_EXPRESSION,
+            "ExpressionAttributeNames": {f"#{name}": name for name in VIDEO_ATTRIBUTES},
+        }
 
-        return normalized_needle in normalized_haystack
+    def _filter_normalized_matches(
+        self, items: List[Dict[str, Any]], search_term: str, normalized_term: str
+    ) -> List[Dict[str, Any]]:
+        """Keep items whose title, author or description contains the search term"""
+        contains = self._text_contains_normalized
+        return [
+            item
+            for item in items
+            if contains(item.get("title", ""), search_term, normalized_term)
+            or contains(item.get("author", ""), search_term, normalized_term)
+            or contains(item.get("description", ""), search_term, normalized_term)
+        ]
 
     def test_connection(self) -> bool:
         """Test DynamoDB connection"""
@@ -156,20 +293,31 @@ class YouTubeDynamoDBClient:
     ) -> Dict[str, Any]:
         """Get videos with pagination and optional transcribed filter"""
         try:
-            scan_kwargs = {"Limit": limit}
+            scan_kwargs = {"Limit": limit, **self._projection_kwargs()}
             if last_evaluated_key:
                 scan_kwargs["ExclusiveStartKey"] = last_evaluated_key
 
-            # Add transcribed filter if specified
-            if transcribed_filter is not None:
-                scan_kwargs["FilterExpression"] = Attr("transcribed").eq(
-                    transcribed_filter
+            if transcribed_filter is not None and self.transcribed_index:
+                # Read only the matching items through the transcribed GSI
+                response = self.table.query(
+                    IndexName=self.transcribed_index,
+                    KeyConditionExpression=Key("transcribed").eq(
+                        1 if transcribed_filter else 0
+                    ),
+                    **scan_kwargs,
                 )
+            else:
+                # Add transcribed filter if specified
+                if transcribed_filter is not None:
+                    scan_kwargs["FilterExpression"] = Attr("transcribed").eq(
+                        transcribed_filter
+                    )
 
-            response = self.table.scan(**scan_kwargs)
+                response = self.table.scan(**scan_kwargs)
 
+            now_iso = datetime.now().isoformat()
             videos = [
-                VideoRecord.from_dynamodb_item(item).to_dict()
+                VideoRecord.item_to_api_dict(item, now_iso)
                 for item in response.get("Items", [])
             ]
 
@@ -194,69 +342,43 @@ class YouTubeDynamoDBClient:
             if not search_term:
                 return self.get_videos(limit, last_evaluated_key)
 
-            # First, try DynamoDB scan with contains for basic filtering
-            scan_kwargs = {
-                "Limit": limit * 3,  # Get more items to filter locally
-                "FilterExpression": (
-                    Attr("title").contains(search_term)
-                    | Attr("author").contains(search_term)
-                    | Attr("description").contains(search_term)
-                ),
-            }
+            if self.search_index is not None:
+                return self._search_videos_indexed(
+                    search_term, limit, last_evaluated_key
+                )
 
+            # A single scan page, matched client-side with normalized text. A
+            # DynamoDB contains() filter cannot fold case/width/kana, and the
+            # normalized match already covers what it would find.
+            normalized_term = self.normalize_text_for_search(search_term)
+            scan_kwargs = {"Limit": limit * 5, **self._projection_kwargs()}
             if last_evaluated_key:
                 scan_kwargs["ExclusiveStartKey"] = last_evaluated_key
 
             response = self.table.scan(**scan_kwargs)
+            matches = self._filter_normalized_matches(
+                response.get("Items", []), search_term, normalized_term
+            )
 
-            # Also do a broader scan for Japanese text normalization
-            all_items = []
-
-            # First add items that matched DynamoDB contains
-            all_items.extend(response.get("Items", []))
-
-            # Then scan more broadly for normalized matching
-            broad_scan_kwargs = {"Limit": limit * 5}  # Cast wider net
-            if last_evaluated_key:
-                broad_scan_kwargs["ExclusiveStartKey"] = last_evaluated_key
-
-            broad_response = self.table.scan(**broad_scan_kwargs)
-
-            # Filter items using normalized text matching
-            normalized_matches = []
-            for item in broad_response.get("Items", []):
-                # Check if any field contains the search term (normalized)
-                title = item.get("title", "")
-                author = item.get("author", "")
-                description = item.get("description", "")
-
-                if (
-                    self._text_contains_normalized(title, search_term)
-                    or self._text_contains_normalized(author, search_term)
-                    or self._text_contains_normalized(description, search_term)
-                ):
-                    normalized_matches.append(item)
-
-            # Combine and deduplicate results
-            seen_ids = set()
-            combined_items = []
-
-            for item in all_items + normalized_matches:
-                video_id = item.get("video_id")
-                if video_id and video_id not in seen_ids:
-                    seen_ids.add(video_id)
-                    combined_items.append(item)
-
-            # Limit results
-            limited_items = combined_items[:limit]
+            # Not enough matches yet: continue the same scan once
+            if len(matches) < limit and response.get("LastEvaluatedKey"):
+                scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+                response = self.table.scan(**scan_kwargs)
+                matches.extend(
+                    self._filter_normalized_matches(
+                        response.get("Items", []), search_term, normalized_term
+                    )
+                )
 
-            videos = [
-                VideoRecord.from_dynamodb_item(item).to_dict() for item in limited_items
-            ]
+            if len(matches) > limit:
+                # Resume right after the last returned item so no match is skipped
+                matches = matches[:limit]
+                next_key = {"video_id": matches[-1]["video_id"]}
+            else:
+                next_key = response.get("LastEvaluatedKey")
 
-            # Determine if there are more results
-            has_more = len(combined_items) > limit
-            next_key = response.get("LastEvaluatedKey") if has_more else None
+            now_iso = datetime.now().isoformat()
+            videos = [VideoRecord.item_to_api_dict(item, now_iso) for item in matches]
 
             return {
                 "videos": videos,
@@ -274,6 +396,32 @@ class YouTubeDynamoDBClient:
                 "search_term": search_term,
             }
 
+    def _search_videos_indexed(
+        self,
+        search_term: str,
+        limit: int,
+        last_evaluated_key: Optional[Dict],
+    ) -> Dict[str, Any]:
+        """Search through the OpenSearch mirror; the page key wraps search_after"""
+        result = self.search_index.search(
+            search_term,
+            limit=limit,
+            search_after=(last_evaluated_key or {}).get("search_after"),
+        )
+        now_iso = datetime.now().isoformat()
+        videos = [
+            VideoRecord.item_to_api_dict(item, now_iso) for item in result["items"]
+        ]
+        next_key = (
+            {"search_after": result["search_after"]} if result["search_after"] else None
+        )
+        return {
+            "videos": videos,
+            "last_evaluated_key": next_key,
+            "count": len(videos),
+            "search_term": search_term,
+        }
+
     def get_video_by_id(self, video_id: str) -> Optional[VideoRecord]:
         """Get a single video by ID"""
         try:
@@ -306,26 +454,21 @@ class YouTubeDynamoDBClient:
         try:
             update_data["updated_at"] = datetime.now().isoformat()
 
-            # Build update expression
-            update_expression = "SET "
-            expression_attribute_values = {}
-
-            for key, value in update_data.items():
-                # Convert datetime objects to ISO format strings for DynamoDB
-                if isinstance(value, datetime):
-                    value = value.isoformat()
-                update_expression += f"#{key} = :{key}, "
-                expression_attribute_values[f":{key}"] = value
-
-            update_expression = update_expression.rstrip(", ")
+            # Build update expression (cached per key set)
+            update_expression, expression_attribute_names = _build_update_expression(
+                tuple(update_data)
+            )
 
-            # Create attribute names mapping
-            expression_attribute_names = {f"#{key}": key for key in update_data.keys()}
+            # Convert datetime objects to ISO format strings for DynamoDB
+            expression_attribute_values = {
+                f":{key}": value.isoformat() if isinstance(value, datetime) else value
+                for key, value in update_data.items()
+            }
 
             response = self.table.update_item(
                 Key={"video_id": video_id},
                 UpdateExpression=update_expression,
-                ExpressionAttributeNames=expression_attribute_names,
+                ExpressionAttributeNames=dict(expression_attribute_names),
                 ExpressionAttributeValues=expression_attribute_values,
                 ReturnValues="ALL_NEW",
             )
@@ -366,6 +509,55 @@ class YouTubeDynamoDBClient:
             self.logger.error(f"Error updating transcribed status for {video_id}: {e}")
             return False
 
+    def batch_update_transcribed_status(
+        self, video_ids: List[str], transcribed: bool
+    ) -> int:
+        """
+        Update transcribed status for many videos, TRANSACT_BATCH_SIZE per request
+
+        Args:
+            video_ids: ビデオIDのリスト
+            transcribed: transcribe状態 (True/False)
+
+        Returns:
+            更新できた件数
+        """
+        update_expression, expression_attribute_names = _build_update_expression(
+            ("transcribed", "updated_at")
+        )
+        expression_attribute_values = {
+            ":transcribed": 1 if transcribed else 0,
+            ":updated_at": datetime.now().isoformat(),
+        }
+
+        updated = 0
+        for start in range(0, len(video_ids), TRANSACT_BATCH_SIZE):
+            batch = video_ids[start : start + TRANSACT_BATCH_SIZE]
+            try:
+                self.table.meta.client.transact_write_items(
+                    TransactItems=[
+                        {
+                            "Update": {
+                                "TableName": self.table_name,
+                                "Key": {"video_id": video_id},
+                                "UpdateExpression": update_expression,
+                                "ExpressionAttributeNames": dict(
+                                    expression_attribute_names
+                                ),
+                                "ExpressionAttributeValues": expression_attribute_values,
+                            }
+                        }
+                        for video_id in batch
+                    ]
+                )
+                updated += len(batch)
+            except ClientError as e:
+                self.logger.error(
+                    f"Error updating transcribed status for {len(batch)} videos: {e}"
+                )
+
+        return updated
+
     def delete_video(self, video_id: str) -> bool:
         """Delete a video record"""
         try:
@@ -376,11 +568,46 @@ class YouTubeDynamoDBClient:
             self.logger.error(f"Error deleting video {video_id}: {e}")
             return False
 
+    def _parallel_scan_count(
+        self, total_segments: int = SCAN_TOTAL_SEGMENTS, **scan_kwargs
+    ) -> int:
+        """Count matching items with a segmented parallel scan, paging each segment"""
+
+        def scan_segment(segment: int) -> int:
+            kwargs = dict(
+                scan_kwargs,
+                Select="COUNT",
+                Segment=segment,
+                TotalSegments=total_segments,
+            )
+            count = 0
+            while True:
+                response = self.table.scan(**kwargs)
+                count += response.get("Count", 0)
+                last_key = response.get("LastEvaluatedKey")
+                if not last_key:
+                    return count
+                kwargs["ExclusiveStartKey"] = last_key
+
+        with ThreadPoolExecutor(max_workers=total_segments) as executor:
+            return sum(executor.map(scan_segment, range(total_segments)))
+
+    def _query_count(self, **query_kwargs) -> int:
+        """Count items matching a query, paging through LastEvaluatedKey"""
+        kwargs = dict(query_kwargs, Select="COUNT")
+        count = 0
+        while True:
+            response = self.table.query(**kwargs)
+            count += response.get("Count", 0)
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return count
+            kwargs["ExclusiveStartKey"] = last_key
+
     def get_video_count(self) -> int:
         """Get total count of videos in the table"""
         try:
-            response = self.table.scan(Select="COUNT")
-            return response.get("Count", 0)
+            return self._parallel_scan_count()
 
         except ClientError as e:
             self.logger.error(f"Error getting video count: {e}")
@@ -389,15 +616,22 @@ class YouTubeDynamoDBClient:
     def get_videos_stats(self) -> Dict[str, int]:
         """Get statistics about videos in the table"""
         try:
-            # Get total count
-            total_response = self.table.scan(Select="COUNT")
-            total_count = total_response.get("Count", 0)
-
-            # Get transcribed count
-            transcribed_response = self.table.scan(
-                Select="COUNT", FilterExpression=Attr("transcribed").eq(True)
-            )
-            transcribed_count = transcribed_response.get("Count", 0)
+            # Get total and transcribed counts concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                total_future = executor.submit(self._parallel_scan_count)
+                if self.transcribed_index:
+                    transcribed_future = executor.submit(
+                        self._query_count,
+                        IndexName=self.transcribed_index,
+                        KeyConditionExpression=Key("transcribed").eq(1),
+                    )
+                else:
+                    transcribed_future = executor.submit(
+                        self._parallel_scan_count,
+                        FilterExpression=Attr("transcribed").eq(True),
+                    )
+                total_count = total_future.result()
+                transcribed_count = transcribed_future.result()
 
             # Get not transcribed count
             not_transcribed_count = total_count - transcribed_count
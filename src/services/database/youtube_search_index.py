@@ -0,0 +1,197 @@
+"""
+YouTube Video Search Index
+Mirrors the DynamoDB video table into OpenSearch for Japanese full-text search
+
+DynamoDB stays the source of truth. A DynamoDB Stream on the video table
+(NEW_IMAGE) triggers ``lambda_handler``, which applies the changes to the index.
+The Stream only carries changes, so existing videos are copied once with
+``python youtube_search_index.py`` (``YouTubeSearchIndex.backfill``).
+Requires ``opensearch-py`` and the analysis-kuromoji / analysis-icu plugins.
+"""
+
+import logging
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+import boto3
+from boto3.dynamodb.types import TypeDeserializer
+
+try:
+    from opensearchpy import OpenSearch, helpers
+except ImportError:
+    OpenSearch = None
+    helpers = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_NAME = "youtube_videos"
+SEARCH_FIELDS = ("title", "author", "description")
+
+# NFKC + width/case folding at index time, so query-side normalization is not needed
+INDEX_BODY = {
+    "settings": {
+        "analysis": {
+            "analyzer": {
+                "ja_norm": {
+                    "type": "custom",
+                    "tokenizer": "kuromoji_tokenizer",
+                    "char_filter": ["icu_normalizer"],
+                    "filter": ["cjk_width", "lowercase", "kuromoji_baseform"],
+                }
+            }
+        }
+    },
+    "mappings": {
+        "properties": {
+            "video_id": {"type": "keyword"},
+            "title": {"type": "text", "analyzer": "ja_norm"},
+            "author": {"type": "text", "analyzer": "ja_norm"},
+            "description": {"type": "text", "analyzer": "ja_norm"},
+            "duration": {"type": "keyword"},
+            "views": {"type": "long"},
+            "url": {"type": "keyword", "index": False},
+            "transcribed": {"type": "integer"},
+            "created_at": {"type": "keyword"},
+            "updated_at": {"type": "keyword"},
+        }
+    },
+}
+
+_deserializer = TypeDeserializer()
+
+
+class YouTubeSearchIndex:
+    """OpenSearch index mirroring the YouTube video table"""
+
+    def __init__(self, url: str, index_name: str = DEFAULT_INDEX_NAME):
+        """Initialize OpenSearch client"""
+        if OpenSearch is None:
+            raise ImportError("opensearch-py is required for YouTubeSearchIndex")
+        self.client = OpenSearch(hosts=[url])
+        self.index_name = index_name
+
+    def ensure_index(self):
+        """Create the index with the Japanese analyzer if it does not exist"""
+        if not self.client.indices.exists(index=self.index_name):
+            self.client.indices.create(index=self.index_name, body=INDEX_BODY)
+            logger.info(f"Created search index: {self.index_name}")
+
+    def backfill(self, table_name: str) -> int:
+        """
+        Copy every item of the video table into the index
+        Args:
+            table_name: DynamoDB video table name
+        Returns:
+            Number of indexed documents
+        """
+        self.ensure_index()
+        success, errors = helpers.bulk(
+            self.client, self._scan_actions(table_name), raise_on_error=False
+        )
+        if errors:
+            raise RuntimeError(
+                f"Backfill failed for {len(errors)} document(s): {errors[:3]}"
+            )
+        logger.info(f"Backfilled {success} video(s) into {self.index_name}")
+        return success
+
+    def _scan_actions(self, table_name: str) -> Iterator[Dict[str, Any]]:
+        """Index actions for every item of the table, one scan page at a time"""
+        table = boto3.resource("dynamodb").Table(table_name)
+        scan_kwargs = {}
+        while True:
+            response = table.scan(**scan_kwargs)
+            for item in response.get("Items", []):
+                yield {
+                    "_index": self.index_name,
+                    "_id": item["video_id"],
+                    "_source": item,
+                }
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return
+            scan_kwargs["ExclusiveStartKey"] = last_key
+
+    def search(
+        self, search_term: str, limit: int = 50, search_after: Optional[List] = None
+    ) -> Dict[str, Any]:
+        """Search title/author/description, paginated with search_after"""
+        body = {
+            "size": limit,
+            "query": {"multi_match": {"query": search_term, "fields": SEARCH_FIELDS}},
+            "sort": [{"_score": "desc"}, {"video_id": "asc"}],
+        }
+        if search_after:
+            body["search_after"] = search_after
+
+        hits = self.client.search(index=self.index_name, body=body)["hits"]["hits"]
+        return {
+            "items": [hit["_source"] for hit in hits],
+            "search_after": hits[-1]["sort"] if len(hits) == limit else None,
+        }
+
+    def apply_stream_records(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Apply DynamoDB Stream records to the index with one bulk request
+        Raises:
+            RuntimeError: if any action failed, so Lambda retries the batch
+            (index/delete by video_id are idempotent)
+        """
+        actions = []
+        for record in records:
+            change = record["dynamodb"]
+            video_id = _deserializer.deserialize(change["Keys"]["video_id"])
+            if record["eventName"] == "REMOVE":
+                actions.append(
+                    {"_op_type": "delete", "_index": self.index_name, "_id": video_id}
+                )
+            else:
+                image = {
+                    key: _deserializer.deserialize(value)
+                    for key, value in change["NewImage"].items()
+                }
+                actions.append(
+                    {"_index": self.index_name, "_id": video_id, "_source": image}
+                )
+
+        success, errors = helpers.bulk(self.client, actions, raise_on_error=False)
+        # Deleting a video that was never indexed is not a failure
+        failures = [
+            error for error in errors if error.get("delete", {}).get("status") != 404
+        ]
+        if failures:
+            raise RuntimeError(
+                f"{len(failures)} of {len(actions)} index action(s) failed: "
+                f"{failures[:3]}"
+            )
+        return success
+
+
+_index: Optional[YouTubeSearchIndex] = None
+
+
+def _get_index() -> YouTubeSearchIndex:
+    """Index for this Lambda container, created (with its mapping) at cold start"""
+    global _index
+    if _index is None:
+        index = YouTubeSearchIndex(
+            os.environ["OPENSEARCH_URL"],
+            os.getenv("OPENSEARCH_INDEX", DEFAULT_INDEX_NAME),
+        )
+        index.ensure_index()
+        _index = index
+    return _index
+
+
+def lambda_handler(event, context):
+    """DynamoDB Stream -> OpenSearch sync entry point"""
+    index = _get_index()
+    indexed = index.apply_stream_records(event.get("Records", []))
+    logger.info(f"Applied {indexed} stream record(s) to {index.index_name}")
+    return {"indexed": indexed}
+
+
+if __name__ == "__main__":
+    # One-shot backfill of videos that existed before the Stream was enabled
+    logging.basicConfig(level=logging.INFO)
+    _get_index().backfill(os.getenv("YOUTUBE_DYNAMODB_TABLE", "youtube_videos"))
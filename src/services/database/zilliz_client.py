@@ -2,17 +2,23 @@
 Zilliz Cloud client for vector database operations
 """
 
+import hashlib
+import heapq
+import json
+import logging
+import os
+import threading
+import time
 import numpy as np
-from typing import List, Dict, Any
-from pymilvus import (
-    connections,
-    Collection,
-    FieldSchema,
-    CollectionSchema,
-    DataType,
-    AnnSearchRequest,
-    RRFRanker,
-)
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter, itemgetter
+from typing import List, Dict, Any, Tuple
+
+try:
+    # numpy bfloat16 dtype, needed to send BFLOAT16_VECTOR rows to pymilvus
+    from ml_dtypes import bfloat16
+except ImportError:
+    bfloat16 = None
 
 from models.conversation_chunk import (
     ConversationChunk,
@@ -20,12 +26,101 @@ from models.conversation_chunk import (
     EmbeddingResult,
 )
 
+logger = logging.getLogger(__name__)
+
+# Storage type of dense_vector in newly created collections ("float16",
+# "bfloat16" or "float32"); existing collections keep the type they were created with
+DENSE_VECTOR_DTYPE = os.getenv("DENSE_VECTOR_DTYPE", "float16")
+if DENSE_VECTOR_DTYPE == "bfloat16" and bfloat16 is None:
+    print("⚠️ ml_dtypes is not installed; using float16 dense vectors instead")
+    DENSE_VECTOR_DTYPE = "float16"
+
+# Dense vector index: HNSW keeps query latency roughly independent of collection size
+DENSE_HNSW_M = 16
+DENSE_HNSW_EF_CONSTRUCTION = 200
+# Minimum HNSW search breadth (raised to 2x the requested top-k when larger);
+# nprobe only applies to collections still indexed with IVF_FLAT
+DENSE_SEARCH_EF = 64
+DENSE_SEARCH_NPROBE = 16
+
+# Sparse vector index/search params (shared, treat as read-only)
+SPARSE_INDEX_PARAMS = {"index_type": "SPARSE_INVERTED_INDEX", "metric_type": "IP"}
+SPARSE_SEARCH_PARAMS = {"metric_type": "IP", "params": {}}
+
+# Reciprocal Rank Fusion rank constant for hybrid_search
+RRF_K = 60.0
+# Error text meaning the server (or client library) has no hybrid search; only
+# these switch a client to client-side fusion for good
+_HYBRID_UNSUPPORTED_MARKERS = ("unimplemented", "not support", "unsupported")
+
+# Concurrent search requests per client; excess callers wait instead of piling
+# up on the shared gRPC channel
+MAX_INFLIGHT_SEARCHES = int(os.getenv("ZILLIZ_MAX_INFLIGHT_SEARCHES", "8"))
+
+# Fields returned with search hits (lists, as pymilvus expects; treat as read-only)
+HYBRID_OUTPUT_FIELDS = [
+    "text",
+    "speaker",
+    "timestamp",
+    "file_name",
+    "chunk_index",
+    "original_length",
+]
+DENSE_OUTPUT_FIELDS = ["text", "speaker", "timestamp", "file_name"]
+
+# Rows per collection.insert() call (bounds memory and request size)
+INSERT_BATCH_SIZE = 1000
+# Insert requests in flight at once: one batch is marshalled while the previous
+# one is on the wire (more than 2 gives little extra throughput)
+INSERT_CONCURRENCY = 2
+
+# Initial loads at least this large go through bulk_load's file import
+BULK_LOAD_MIN_ROWS = 10_000
+# Bucket (and S3-compatible endpoint) the server reads bulk-insert files from;
+# bulk_load falls back to insert_data when unset
+BULK_LOAD_BUCKET = os.getenv("ZILLIZ_BULK_BUCKET")
+BULK_LOAD_ENDPOINT = os.getenv("ZILLIZ_BULK_ENDPOINT", "s3.amazonaws.com")
+BULK_LOAD_POLL_SECONDS = 5
+
+# ConversationChunk fields in schema order (the vectors follow id)
+_CHUNK_FIELDS = (
+    "id",
+    "text",
+    "speaker",
+    "timestamp",
+    "chunk_index",
+    "original_length",
+    "file_name",
+)
+_CHUNK_COLUMNS = attrgetter(*_CHUNK_FIELDS)
+
+# pymilvus DataType member name per DENSE_VECTOR_DTYPE (pymilvus is imported
+# lazily inside the methods that need it, keeping this module cheap to import)
+_DENSE_FIELD_TYPES = {
+    "float16": "FLOAT16_VECTOR",
+    "bfloat16": "BFLOAT16_VECTOR",
+    "float32": "FLOAT_VECTOR",
+}
+
+# Shared clients per (uri, token, collection_name), see ZillizClient.get
+_CLIENT_POOL: Dict[Tuple[str, str, str], "ZillizClient"] = {}
+_CLIENT_POOL_LOCK = threading.Lock()
+
 
 class ZillizClient:
     """Zilliz Cloud client for database operations"""
 
+    # HNSW parameters (override on the class or an instance to retune)
+    hnsw_m = DENSE_HNSW_M
+    hnsw_ef_construction = DENSE_HNSW_EF_CONSTRUCTION
+    search_ef = DENSE_SEARCH_EF
+
     def __init__(
-        self, uri: str, token: str, collection_name: str = "conversation_chunks_hybrid"
+        self,
+        uri: str,
+        token: str,
+        collection_name: str = "conversation_chunks_hybrid",
+        insert_batch_size: int = INSERT_BATCH_SIZE,
     ):
         """
         Initialize Zilliz client
@@ -33,19 +128,67 @@ class ZillizClient:
             uri: Zilliz Cloud URI
             token: Zilliz Cloud token
             collection_name: Collection name
+            insert_batch_size: Rows per insert request
         """
         self.uri = uri
         self.token = token
         self.collection_name = collection_name
+        self.insert_batch_size = insert_batch_size
+        # One pymilvus connection alias per cluster/credentials, so clients for
+        # different clusters never share a connection
+        self.alias = (
+            "zilliz-" + hashlib.sha1(f"{uri}\0{token}".encode("utf-8")).hexdigest()[:16]
+        )
         self.collection = None
+        self.dense_dtype = np.float32
+        # Set once both vector indexes are known to exist, so inserts skip
+        # the index check RPC afterwards
+        self._indexes_ready = False
+        # Cleared when the server reports hybrid search as unsupported
+        self._server_hybrid = True
+        # Runs the dense and sparse legs of hybrid_search concurrently
+        self._search_pool = ThreadPoolExecutor(
+            max_workers=2 * MAX_INFLIGHT_SEARCHES, thread_name_prefix="zilliz-search"
+        )
+        # Bounds concurrent searches from request-handling threads
+        self._search_slots = threading.BoundedSemaphore(MAX_INFLIGHT_SEARCHES)
+        # Overlaps insert requests of one insert_data call
+        self._insert_pool = ThreadPoolExecutor(
+            max_workers=INSERT_CONCURRENCY, thread_name_prefix="zilliz-insert"
+        )
 
         self._connect()
         self._setup_collection()
 
+    @classmethod
+    def get(
+        cls, uri: str, token: str, collection_name: str = "conversation_chunks_hybrid"
+    ) -> "ZillizClient":
+        """
+        Return the shared client for uri/token/collection_name, creating it on first use
+        Args:
+            uri: Zilliz Cloud URI
+            token: Zilliz Cloud token
+            collection_name: Collection name
+        Returns:
+            ZillizClient instance
+        """
+        key = (uri, token, collection_name)
+        with _CLIENT_POOL_LOCK:
+            client = _CLIENT_POOL.get(key)
+            if client is None:
+                client = _CLIENT_POOL[key] = cls(uri, token, collection_name)
+            return client
+
     def _connect(self):
-        """Connect to Zilliz Cloud"""
+        """Connect to Zilliz Cloud (reusing this cluster's open connection)"""
+        from pymilvus import connections
+
         try:
-            connections.connect(alias="default", uri=self.uri, token=self.token)
+            if connections.has_connection(self.alias):
+                print("✅ Reusing Zilliz Cloud connection")
+                return
+            connections.connect(alias=self.alias, uri=self.uri, token=self.token)
             print("✅ Connected to Zilliz Cloud")
         except Exception as e:
             print(f"❌ Zilliz Cloud connection error: {e}")
@@ -54,26 +197,28 @@ class ZillizClient:
     def _setup_collection(self):
         """Setup collection with hybrid search support - create if doesn't exist"""
         try:
-            from pymilvus import utility
+            from pymilvus import Collection, utility
 
-            # Check if collection exists
-            if not utility.has_collection(self.collection_name):
+            # Check if collection exists (existing data is always reused;
+            # use rebuild_collection() to start over)
+            if not utility.has_collection(self.collection_name, using=self.alias):
                 print(
                     f"⚠️ Collection '{self.collection_name}' does not exist. Creating it..."
                 )
                 self._create_collection()
             else:
                 # Connect to existing collection
-                self.collection = Collection(self.collection_name)
+                self.collection = Collection(self.collection_name, using=self.alias)
                 print(f"✅ Connected to existing collection '{self.collection_name}'")
 
-            # Verify required indexes exist (for existing collections)
-            if utility.has_collection(self.collection_name):
+                # Verify required indexes exist (for existing collections)
                 try:
                     self._verify_required_indexes()
+                    self._indexes_ready = True
                 except Exception as idx_err:
                     print(f"⚠️ Index verification failed: {idx_err}")
-                    print("💡 This is normal for newly created collections")
+
+            self.dense_dtype = self._detect_dense_dtype()
 
             # Try to load collection
             try:
@@ -89,8 +234,25 @@ class ZillizClient:
             print(f"❌ Collection setup error: {e}")
             raise
 
+    def rebuild_collection(self):
+        """
+        Drop the collection and recreate it empty with the current schema/indexes.
+        Destructive: all stored vectors are deleted (admin use only).
+        """
+        from pymilvus import utility
+
+        if utility.has_collection(self.collection_name, using=self.alias):
+            utility.drop_collection(self.collection_name, using=self.alias)
+            print(f"🗑️ Dropped collection '{self.collection_name}'")
+        self._indexes_ready = False
+
+        self._create_collection()
+        self.dense_dtype = self._detect_dense_dtype()
+
     def _create_collection(self):
         """Create new collection with hybrid search schema"""
+        from pymilvus import Collection, CollectionSchema, DataType, FieldSchema
+
         try:
             print(
                 f"🔨 Creating collection '{self.collection_name}' with hybrid search schema..."
@@ -102,7 +264,12 @@ class ZillizClient:
                     name="id", dtype=DataType.VARCHAR, max_length=500, is_primary=True
                 ),
                 FieldSchema(
-                    name="dense_vector", dtype=DataType.FLOAT_VECTOR, dim=768
+                    name="dense_vector",
+                    dtype=getattr(
+                        DataType,
+                        _DENSE_FIELD_TYPES.get(DENSE_VECTOR_DTYPE, "FLOAT_VECTOR"),
+                    ),
+                    dim=768,
                 ),  # SentenceTransformer embedding dimension
                 FieldSchema(
                     name="sparse_vector", dtype=DataType.SPARSE_FLOAT_VECTOR
@@ -123,13 +290,15 @@ class ZillizClient:
 
             # Create collection
             self.collection = Collection(
-                name=self.collection_name, schema=schema, using="default"
+                name=self.collection_name, schema=schema, using=self.alias
             )
 
             print(f"✅ Collection '{self.collection_name}' created successfully")
             print("📋 Schema:")
             print(f"   - id: Primary key (VARCHAR)")
-            print(f"   - dense_vector: SentenceTransformer embeddings (768D)")
+            print(
+                f"   - dense_vector: SentenceTransformer embeddings (768D, {DENSE_VECTOR_DTYPE})"
+            )
             print(f"   - sparse_vector: TF-IDF sparse vectors")
             print(
                 f"   - text, speaker, timestamp, chunk_index, original_length, file_name"
@@ -142,6 +311,53 @@ class ZillizClient:
             print(f"❌ Collection creation error: {e}")
             raise
 
+    def _detect_dense_dtype(self):
+        """Return the numpy dtype matching the collection's dense_vector field"""
+        from pymilvus import DataType
+
+        for field in self.collection.schema.fields:
+            if field.name == "dense_vector":
+                if field.dtype == DataType.FLOAT16_VECTOR:
+                    return np.float16
+                if field.dtype == DataType.BFLOAT16_VECTOR:
+                    if bfloat16 is None:
+                        raise ImportError(
+                            "ml_dtypes is required for BFLOAT16_VECTOR collections"
+                        )
+                    return bfloat16
+                break
+        return np.float32
+
+    def _dense_column(self, vectors: np.ndarray):
+        """
+        Convert dense vectors to the form the dense_vector field accepts
+        Args:
+            vectors: (n, D) vectors, or a single (D,) vector, of any float dtype
+        Returns:
+            One contiguous row per vector in the field's dtype (float16/bfloat16/
+            float32), never float64
+        """
+        # One contiguous ndarray row per vector (no Python float lists)
+        return list(np.atleast_2d(np.asarray(vectors, dtype=self.dense_dtype)))
+
+    def _dense_index_params(self) -> Dict[str, Any]:
+        """HNSW index params for dense_vector"""
+        return {
+            "metric_type": "IP",  # Inner Product for cosine similarity
+            "index_type": "HNSW",
+            "params": {"M": self.hnsw_m, "efConstruction": self.hnsw_ef_construction},
+        }
+
+    def _dense_search_params(self, limit: int) -> Dict[str, Any]:
+        """Dense search params; HNSW requires ef >= limit, 2x keeps recall up"""
+        return {
+            "metric_type": "IP",
+            "params": {
+                "ef": max(self.search_ef, 2 * limit),
+                "nprobe": DENSE_SEARCH_NPROBE,
+            },
+        }
+
     def _verify_required_indexes(self):
         """Verify that required indexes exist"""
         try:
@@ -164,56 +380,169 @@ class ZillizClient:
             print(f"❌ Index verification error: {e}")
             raise
 
-    def insert_data(self, chunks: List[ConversationChunk], embeddings: EmbeddingResult):
+    def insert_data(
+        self,
+        chunks: List[ConversationChunk],
+        embeddings: EmbeddingResult,
+        flush: bool = False,
+    ):
         """
-        Insert data with both dense and sparse vectors into Zilliz Cloud
+        Insert data with both dense and sparse vectors into Zilliz Cloud,
+        insert_batch_size rows per request, INSERT_CONCURRENCY requests at a time
         Args:
             chunks: List of conversation chunks
-            embeddings: Embedding results containing both dense and sparse vectors
+            embeddings: Embedding results containing both dense and sparse vectors;
+                sparse_embeddings may be a list of dicts or a scipy CSR matrix,
+                which pymilvus converts row by row from indptr itself
+            flush: Seal the inserted segments once all batches are sent
+                (otherwise call flush() after the last insert)
         """
-        data = [
-            [chunk.id for chunk in chunks],
-            embeddings.dense_embeddings.tolist(),
-            embeddings.sparse_embeddings,
-            [chunk.text for chunk in chunks],
-            [chunk.speaker for chunk in chunks],
-            [chunk.timestamp for chunk in chunks],
-            [chunk.chunk_index for chunk in chunks],
-            [chunk.original_length for chunk in chunks],
-            [chunk.file_name for chunk in chunks],
-        ]
+
+        def insert_batch(start: int):
+            end = start + self.insert_batch_size
+            batch = chunks[start:end]
+            # One pass over the chunks, transposed into per-field columns
+            ids, *scalar_columns = map(list, zip(*map(_CHUNK_COLUMNS, batch)))
+            self.collection.insert(
+                [
+                    ids,
+                    self._dense_column(embeddings.dense_embeddings[start:end]),
+                    embeddings.sparse_embeddings[start:end],
+                    *scalar_columns,
+                ]
+            )
 
         try:
-            self.collection.insert(data)
+            starts = range(0, len(chunks), self.insert_batch_size)
+            if len(starts) > 1:
+                # Consume the iterator so the first failed batch raises here
+                list(self._insert_pool.map(insert_batch, starts))
+            else:
+                for start in starts:
+                    insert_batch(start)
             print(f"✅ Inserted {len(chunks)} chunks with hybrid vectors")
 
+            if flush:
+                self.flush()
+
             # Only create indexes if they don't exist yet
-            self._create_indexes_if_needed()
+            if not self._indexes_ready:
+                self._create_indexes_if_needed()
 
         except Exception as e:
             print(f"❌ Data insertion error: {e}")
             raise
 
+    def bulk_load(
+        self,
+        chunks: List[ConversationChunk],
+        embeddings: EmbeddingResult,
+        timeout: float = 3600,
+    ):
+        """
+        Load a large initial dataset through Parquet files and
+        utility.do_bulk_insert; the server builds segments from the files
+        instead of taking rows through the insert path.
+        Loads under BULK_LOAD_MIN_ROWS, or without ZILLIZ_BULK_BUCKET, use insert_data.
+        Requires the pymilvus[bulk_writer] extra (pyarrow, minio).
+        Args:
+            chunks: List of conversation chunks
+            embeddings: Embedding results with dense and sparse vectors
+            timeout: Seconds to wait for the import tasks
+        """
+        if len(chunks) < BULK_LOAD_MIN_ROWS or not BULK_LOAD_BUCKET:
+            self.insert_data(chunks, embeddings, flush=True)
+            return
+
+        from pymilvus import BulkInsertState, utility
+        from pymilvus.bulk_writer import BulkFileType, RemoteBulkWriter
+
+        try:
+            writer = RemoteBulkWriter(
+                schema=self.collection.schema,
+                remote_path=f"bulk/{self.collection_name}",
+                connect_param=RemoteBulkWriter.S3ConnectParam(
+                    endpoint=BULK_LOAD_ENDPOINT,
+                    access_key=os.getenv("AWS_ACCESS_KEY_ID"),
+                    secret_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                    bucket_name=BULK_LOAD_BUCKET,
+                    region=os.getenv("AWS_REGION"),
+                ),
+                file_type=BulkFileType.PARQUET,
+            )
+            dense_rows = self._dense_column(embeddings.dense_embeddings)
+            sparse_rows = self._sparse_rows(embeddings.sparse_embeddings)
+            for chunk, dense, sparse in zip(chunks, dense_rows, sparse_rows):
+                row = dict(zip(_CHUNK_FIELDS, _CHUNK_COLUMNS(chunk)))
+                row["dense_vector"] = dense
+                row["sparse_vector"] = sparse
+                writer.append_row(row)
+            writer.commit()
+            print(f"📦 Wrote {len(chunks)} rows to {len(writer.batch_files)} file(s)")
+
+            pending = {
+                utility.do_bulk_insert(
+                    self.collection_name, files=files, using=self.alias
+                )
+                for files in writer.batch_files
+            }
+            deadline = time.monotonic() + timeout
+            while pending:
+                for task_id in list(pending):
+                    state = utility.get_bulk_insert_state(task_id, using=self.alias)
+                    if state.state == BulkInsertState.ImportCompleted:
+                        pending.discard(task_id)
+                    elif state.state in (
+                        BulkInsertState.ImportFailed,
+                        BulkInsertState.ImportFailedAndCleaned,
+                    ):
+                        raise RuntimeError(
+                            f"Bulk insert task {task_id} failed: {state.failed_reason}"
+                        )
+                if pending:
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(
+                            f"Bulk insert tasks still running: {sorted(pending)}"
+                        )
+                    time.sleep(BULK_LOAD_POLL_SECONDS)
+            print(f"✅ Bulk loaded {len(chunks)} chunks with hybrid vectors")
+
+            if not self._indexes_ready:
+                self._create_indexes_if_needed()
+
+        except Exception as e:
+            print(f"❌ Bulk load error: {e}")
+            raise
+
+    @staticmethod
+    def _sparse_rows(sparse_embeddings):
+        """Yield one {index: weight} dict per row from a CSR matrix or dict list"""
+        if not hasattr(sparse_embeddings, "tocsr"):
+            yield from sparse_embeddings
+            return
+        csr = sparse_embeddings.tocsr()
+        indptr, indices, data = csr.indptr, csr.indices.tolist(), csr.data.tolist()
+        for start, end in zip(indptr[:-1].tolist(), indptr[1:].tolist()):
+            yield dict(zip(indices[start:end], data[start:end]))
+
+    def flush(self):
+        """Seal growing segments so inserted data is persisted and indexed"""
+        self.collection.flush()
+        print("✅ Collection flushed")
+
     def _create_indexes_for_empty_collection(self):
         """Create indexes for empty collection (called during setup)"""
         try:
             print("🔧 Creating initial indexes for empty collection...")
 
-            # Dense vector index - use FLAT for small collections
-            dense_index_params = {
-                "metric_type": "IP",  # Inner Product for cosine similarity
-                "index_type": "FLAT",  # Simple flat index for new collections
-            }
-            self.collection.create_index("dense_vector", dense_index_params)
-            print("   ✅ Dense vector index created (FLAT/IP)")
+            # Dense vector index
+            self.collection.create_index("dense_vector", self._dense_index_params())
+            print("   ✅ Dense vector index created (HNSW/IP)")
 
             # Sparse vector index
-            sparse_index_params = {
-                "index_type": "SPARSE_INVERTED_INDEX",
-                "metric_type": "IP",
-            }
-            self.collection.create_index("sparse_vector", sparse_index_params)
+            self.collection.create_index("sparse_vector", SPARSE_INDEX_PARAMS)
             print("   ✅ Sparse vector index created (SPARSE_INVERTED_INDEX/IP)")
+            self._indexes_ready = True
 
             # Load collection
             self.collection.load()
@@ -234,12 +563,7 @@ class ZillizClient:
             # Dense vector index
             if "dense_vector" not in existing_fields:
                 print("🔧 Creating dense vector index...")
-                dense_index_params = {
-                    "metric_type": "IP",  # Inner Product
-                    "index_type": "IVF_FLAT",
-                    "params": {"nlist": 128},
-                }
-                self.collection.create_index("dense_vector", dense_index_params)
+                self.collection.create_index("dense_vector", self._dense_index_params())
                 print("   ✅ Dense vector index created")
             else:
                 print("   ✅ Dense vector index already exists")
@@ -247,14 +571,11 @@ class ZillizClient:
             # Sparse vector index
             if "sparse_vector" not in existing_fields:
                 print("🔧 Creating sparse vector index...")
-                sparse_index_params = {
-                    "index_type": "SPARSE_INVERTED_INDEX",
-                    "metric_type": "IP",
-                }
-                self.collection.create_index("sparse_vector", sparse_index_params)
+                self.collection.create_index("sparse_vector", SPARSE_INDEX_PARAMS)
                 print("   ✅ Sparse vector index created")
             else:
                 print("   ✅ Sparse vector index already exists")
+            self._indexes_ready = True
 
             # Load collection if not loaded
             try:
@@ -274,19 +595,11 @@ class ZillizClient:
         """Create indexes for both dense and sparse vectors"""
         try:
             # Dense vector index
-            dense_index_params = {
-                "metric_type": "IP",  # Inner Product
-                "index_type": "IVF_FLAT",
-                "params": {"nlist": 128},
-            }
-            self.collection.create_index("dense_vector", dense_index_params)
+            self.collection.create_index("dense_vector", self._dense_index_params())
 
             # Sparse vector index
-            sparse_index_params = {
-                "index_type": "SPARSE_INVERTED_INDEX",
-                "metric_type": "IP",
-            }
-            self.collection.create_index("sparse_vector", sparse_index_params)
+            self.collection.create_index("sparse_vector", SPARSE_INDEX_PARAMS)
+            self._indexes_ready = True
 
             self.collection.load()
             print("✅ Created hybrid indexes and loaded collection")
@@ -307,6 +620,17 @@ class ZillizClient:
         Perform hybrid search by independently searching dense and sparse,
         then fusing with Reciprocal Rank Fusion (RRF).
         - dense: weight alpha, sparse: weight (1-alpha)
+        - equal weights are fused on the server in one round-trip; other
+          weights (or servers without hybrid search) fuse on the client
+        Args:
+            dense_query: (D,) or (1, D) query vector; converted once to the
+                dense_vector dtype, so float64 input is never sent as is
+            sparse_query: Sparse query vector {term index: weight}
+            limit: Number of results to return
+            rerank_k: Candidates per leg before fusion
+            alpha: Dense weight in RRF
+        Returns:
+            List of search results
         """
         try:
             if self.collection is None:
@@ -317,153 +641,260 @@ class ZillizClient:
             alpha = min(max(alpha, 0.0), 1.0)
             k = max(limit, rerank_k)
 
-            out_fields = [
-                "text",
-                "speaker",
-                "timestamp",
-                "file_name",
-                "chunk_index",
-                "original_length",
-            ]
-
-            # Dense phase
-            dense_params = {"metric_type": "IP", "params": {"nprobe": 16}}
-            dense_hits = []
-            try:
-                dres = self.collection.search(
-                    dense_query,
+            def search_leg(name, data, field, params):
+                try:
+                    # Ids only: fields are fetched for the fused winners afterwards
+                    res = self.collection.search(
+                        data, field, params, limit=k, output_fields=[]
+                    )
+                    return list(res[0]) if res and res[0] else []
+                except Exception as e:
+                    print(f"⚠️ {name} phase failed in hybrid: {e}")
+                    return []
+
+            with self._search_slots:
+                if alpha == 0.5 and self._server_hybrid:
+                    results = self._server_hybrid_search(
+                        dense_query, sparse_query, limit, k, HYBRID_OUTPUT_FIELDS
+                    )
+                    if results is not None:
+                        return results
+
+                # Dense and sparse phases run concurrently (wall time = slower leg)
+                dense_future = self._search_pool.submit(
+                    search_leg,
+                    "Dense",
+                    self._dense_column(dense_query),
                     "dense_vector",
-                    dense_params,
-                    limit=k,
-                    output_fields=out_fields,
+                    self._dense_search_params(k),
                 )
-                if dres and dres[0]:
-                    dense_hits = list(dres[0])
-            except Exception as de:
-                print(f"⚠️ Dense phase failed in hybrid: {de}")
-
-            # Sparse phase
-            sparse_params = {"metric_type": "IP", "params": {}}
-            sparse_hits = []
-            try:
-                sres = self.collection.search(
+                sparse_future = self._search_pool.submit(
+                    search_leg,
+                    "Sparse",
                     [sparse_query],
                     "sparse_vector",
-                    sparse_params,
-                    limit=k,
-                    output_fields=out_fields,
+                    SPARSE_SEARCH_PARAMS,
                 )
-                if sres and sres[0]:
-                    sparse_hits = list(sres[0])
-            except Exception as se:
-                print(f"⚠️ Sparse phase failed in hybrid: {se}")
+                dense_hits = dense_future.result()
+                sparse_hits = sparse_future.result()
 
             # If only one side available, return it
             if not dense_hits and not sparse_hits:
                 return []
             if dense_hits and not sparse_hits:
-                return [
-                    self._to_search_result(h, "hybrid[dense-only]")
-                    for h in dense_hits[:limit]
-                ]
+                top_hits = dense_hits[:limit]
+                return self._hydrate(
+                    [h.id for h in top_hits],
+                    [h.score for h in top_hits],
+                    "hybrid[dense-only]",
+                )
             if sparse_hits and not dense_hits:
-                return [
-                    self._to_search_result(h, "hybrid[sparse-only]")
-                    for h in sparse_hits[:limit]
-                ]
+                top_hits = sparse_hits[:limit]
+                return self._hydrate(
+                    [h.id for h in top_hits],
+                    [h.score for h in top_hits],
+                    "hybrid[sparse-only]",
+                )
 
-            # Build rank maps (1-based ranks)
-            def rank_map(hits):
-                m = {}
-                for i, h in enumerate(hits, start=1):
-                    try:
-                        key = h.id
-                    except Exception:
-                        # Fallback if .id isn't available
-                        try:
-                            key = h.entity.get("id")
-                        except Exception:
-                            key = str(i)
-                    m[key] = i
-                return m
-
-            r_dense = rank_map(dense_hits)
-            r_sparse = rank_map(sparse_hits)
-
-            # RRF fusion
-            K = 60.0
-            candidates = set(r_dense.keys()) | set(r_sparse.keys())
-            fused = {}
-            for cid in candidates:
-                s = 0.0
-                rd = r_dense.get(cid)
-                rs = r_sparse.get(cid)
-                if rd is not None:
-                    s += alpha * (1.0 / (K + rd))
-                if rs is not None:
-                    s += (1.0 - alpha) * (1.0 / (K + rs))
-                fused[cid] = s
-
-            # Map id -> hit
-            hit_by_id = {}
-            for h in dense_hits:
-                try:
-                    hit_by_id[h.id] = h
-                except Exception:
-                    pass
-            for h in sparse_hits:
-                try:
-                    if h.id not in hit_by_id:
-                        hit_by_id[h.id] = h
-                except Exception:
-                    pass
-
-            # Sort and take top limit
-            top_ids = sorted(fused.keys(), key=lambda x: fused[x], reverse=True)[:limit]
-            results: List[SearchResult] = []
-            for cid in top_ids:
-                h = hit_by_id.get(cid)
-                if h is None:
-                    continue
-                results.append(
-                    self._to_search_result(h, "hybrid", override_score=fused[cid])
+            # RRF fusion (vectorized over the candidate ids); positions index
+            # dense_ids + sparse_ids
+            dense_ids = [h.id for h in dense_hits]
+            sparse_ids = [h.id for h in sparse_hits]
+            candidate_ids = dense_ids + sparse_ids
+            try:
+                top_positions, top_scores = self._rrf_fuse_numpy(
+                    dense_ids, sparse_ids, alpha=alpha, top=limit
+                )
+            except TypeError:
+                # Ids np.unique cannot order (object arrays, e.g. None among strs)
+                top_positions, top_scores = self._rrf_fuse_heap(
+                    dense_ids, sparse_ids, alpha=alpha, top=limit
                 )
 
-            return results
+            return self._hydrate(
+                [candidate_ids[pos] for pos in top_positions.tolist()],
+                top_scores.tolist(),
+                "hybrid",
+            )
 
         except Exception as e:
             print(f"❌ Hybrid search error: {e}")
             return []
 
+    def _hydrate(
+        self, ids: List[Any], scores: List[float], search_type: str
+    ) -> List[SearchResult]:
+        """
+        Fetch output fields of ranked ids with one query
+        Args:
+            ids: Result ids, best first
+            scores: Score per id
+            search_type: search_type of the results
+        Returns:
+            Search results in the order of ids (ids no longer stored are skipped)
+        """
+        if not ids:
+            return []
+        with self._search_slots:
+            rows = self.collection.query(
+                expr=f"id in {json.dumps(ids, ensure_ascii=False)}",
+                output_fields=HYBRID_OUTPUT_FIELDS,
+            )
+        row_by_id = {row["id"]: row for row in rows}
+        return [
+            self._to_search_result(row_by_id[cid], search_type, override_score=score)
+            for cid, score in zip(ids, scores)
+            if cid in row_by_id
+        ]
+
+    def _server_hybrid_search(
+        self,
+        dense_query: np.ndarray,
+        sparse_query: Dict[str, float],
+        limit: int,
+        k: int,
+        out_fields: List[str],
+    ) -> List[SearchResult] | None:
+        """
+        Equal-weight RRF hybrid search fused by the server
+        Returns:
+            Search results, or None to fuse on the client for this call
+        """
+        try:
+            from pymilvus import AnnSearchRequest, RRFRanker
+
+            dense_req = AnnSearchRequest(
+                data=self._dense_column(dense_query),
+                anns_field="dense_vector",
+                param=self._dense_search_params(k),
+                limit=k,
+            )
+            sparse_req = AnnSearchRequest(
+                data=[sparse_query],
+                anns_field="sparse_vector",
+                param=SPARSE_SEARCH_PARAMS,
+                limit=k,
+            )
+            res = self.collection.hybrid_search(
+                [dense_req, sparse_req],
+                RRFRanker(int(RRF_K)),
+                limit=limit,
+                output_fields=out_fields,
+            )
+        except (ImportError, AttributeError) as e:
+            # pymilvus without AnnSearchRequest/RRFRanker or Collection.hybrid_search
+            logger.warning(
+                f"Hybrid search unsupported by pymilvus, fusing locally: {e}"
+            )
+            self._server_hybrid = False
+            return None
+        except Exception as e:
+            if any(marker in str(e).lower() for marker in _HYBRID_UNSUPPORTED_MARKERS):
+                logger.warning(
+                    f"Hybrid search unsupported by the server, fusing locally: {e}"
+                )
+                self._server_hybrid = False
+            else:
+                # Transient (timeout, gRPC error): fall back for this call only
+                logger.warning(f"Server-side hybrid search failed, fusing locally: {e}")
+            return None
+
+        # RRFRanker sums 1/(k+rank) over both legs; halve it to match the alpha=0.5
+        # weighting of the client-side fusion
+        return [
+            self._to_search_result(h, "hybrid", override_score=0.5 * h.score)
+            for h in (res[0] if res else [])
+        ]
+
+    @staticmethod
+    def _rrf_fuse_numpy(
+        dense_ids: List[Any],
+        sparse_ids: List[Any],
+        alpha: float,
+        top: int,
+        k: float = RRF_K,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Weighted Reciprocal Rank Fusion of two ranked id lists
+        Args:
+            dense_ids: Ids from the dense leg, best first
+            sparse_ids: Ids from the sparse leg, best first
+            alpha: Weight of the dense leg (sparse gets 1 - alpha)
+            top: Number of fused results to return
+            k: RRF rank constant
+        Returns:
+            (positions, scores) of the top fused results, best first; a position
+            indexes dense_ids + sparse_ids at the id's first occurrence
+        """
+        ids = np.asarray(list(dense_ids) + list(sparse_ids))
+        if ids.size == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+
+        unique_ids, first, inverse = np.unique(
+            ids, return_index=True, return_inverse=True
+        )
+        contributions = np.concatenate(
+            [
+                alpha / (k + np.arange(1, len(dense_ids) + 1)),
+                (1.0 - alpha) / (k + np.arange(1, len(sparse_ids) + 1)),
+            ]
+        )
+        scores = np.zeros(len(unique_ids))
+        np.add.at(scores, inverse, contributions)
+
+        # Select winners without sorting every candidate, then order them
+        top = min(top, len(unique_ids))
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return first[best], scores[best]
+
+    @staticmethod
+    def _rrf_fuse_heap(
+        dense_ids: List[Any],
+        sparse_ids: List[Any],
+        alpha: float,
+        top: int,
+        k: float = RRF_K,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Dict/heap version of _rrf_fuse_numpy for ids that only need to be hashable"""
+        fused: Dict[Any, float] = {}
+        first: Dict[Any, int] = {}
+        for pos, cid in enumerate(dense_ids):
+            fused[cid] = fused.get(cid, 0.0) + alpha / (k + pos + 1)
+            first.setdefault(cid, pos)
+        offset = len(dense_ids)
+        for rank, cid in enumerate(sparse_ids, 1):
+            fused[cid] = fused.get(cid, 0.0) + (1.0 - alpha) / (k + rank)
+            first.setdefault(cid, offset + rank - 1)
+
+        # O(n log top) selection instead of sorting every candidate
+        best = heapq.nlargest(top, fused.items(), key=itemgetter(1))
+        return (
+            np.array([first[cid] for cid, _ in best], dtype=np.intp),
+            np.array([score for _, score in best]),
+        )
+
     def _to_search_result(
         self, hit, search_type: str, override_score: float | None = None
     ) -> SearchResult:
         """Convert Milvus hit to SearchResult with safe fallbacks."""
-        try:
-            text = hit.entity.get("text", "")
-        except Exception:
-            try:
-                text = hit.get("text", "")
-            except Exception:
-                text = ""
-        try:
-            speaker = hit.entity.get("speaker", "")
-            timestamp = hit.entity.get("timestamp", "")
-            file_name = hit.entity.get("file_name", "")
-        except Exception:
-            speaker = timestamp = file_name = ""
-
-        score = (
-            float(override_score)
-            if override_score is not None
-            else float(getattr(hit, "score", 0.0))
+        # Resolve the fields once without raising: query() rows (_hydrate) are
+        # plain dicts, search hits expose them through .entity
+        if type(hit) is dict:
+            fields = hit
+        else:
+            fields = getattr(hit, "entity", None) or {}
+        get = fields.get
+
+        score = float(
+            override_score if override_score is not None else getattr(hit, "score", 0.0)
         )
 
         return SearchResult(
-            text=text,
-            speaker=speaker,
-            timestamp=timestamp,
-            file_name=file_name,
+            text=get("text", ""),
+            speaker=get("speaker", ""),
+            timestamp=get("timestamp", ""),
+            file_name=get("file_name", ""),
             score=score,
             similarity=score,
             search_type=search_type,
@@ -475,37 +906,22 @@ class ZillizClient:
         """
         Perform dense vector search only
         Args:
-            dense_query: Dense query vector
+            dense_query: (D,) or (1, D) query vector, converted to the dense_vector dtype
             limit: Number of results to return
         Returns:
             List of search results
         """
-        search_params = {"metric_type": "IP", "params": {"nprobe": 10}}
-
         try:
-            results = self.collection.search(
-                dense_query,
-                "dense_vector",
-                search_params,
-                limit=limit,
-                output_fields=["text", "speaker", "timestamp", "file_name"],
-            )
-
-            search_results = []
-            for hit in results[0]:
-                search_results.append(
-                    SearchResult(
-                        text=hit.entity.get("text", ""),
-                        speaker=hit.entity.get("speaker", ""),
-                        timestamp=hit.entity.get("timestamp", ""),
-                        file_name=hit.entity.get("file_name", ""),
-                        score=hit.score,
-                        similarity=hit.score,  # Use score as similarity for now
-                        search_type="dense",
-                    )
+            with self._search_slots:
+                results = self.collection.search(
+                    self._dense_column(dense_query),
+                    "dense_vector",
+                    self._dense_search_params(limit),
+                    limit=limit,
+                    output_fields=DENSE_OUTPUT_FIELDS,
                 )
 
-            return search_results
+            return [self._to_search_result(hit, "dense") for hit in results[0]]
 
         except Exception as e:
             print(f"❌ Dense search error: {e}")
@@ -544,11 +960,15 @@ class ZillizClient:
                 from pymilvus import utility
 
                 try:
-                    index_list = utility.list_indexes(self.collection_name)
+                    index_list = utility.list_indexes(
+                        self.collection_name, using=self.alias
+                    )
                 except Exception:
                     # Fallback to get_index_info or empty
                     try:
-                        info = utility.get_index_info(self.collection_name)
+                        info = utility.get_index_info(
+                            self.collection_name, using=self.alias
+                        )
                         index_list = info if info is not None else []
                     except Exception:
                         index_list = []
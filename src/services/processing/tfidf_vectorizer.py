@@ -5,13 +5,21 @@ TF-IDF based sparse vector generator for Japanese text
 import re
 import numpy as np
 import os
+import scipy.sparse as sp
+from collections import Counter
 from typing import List, Dict
 
 try:
     import joblib  # for model persistence
 except Exception:
     joblib = None
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import (
+    HashingVectorizer,
+    TfidfTransformer,
+    TfidfVectorizer,
+)
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import normalize
 from dotenv import load_dotenv
 
 # .envファイルを読み込み
@@ -36,6 +44,148 @@ except ImportError:
         print("⚠️ MeCab/fugashi not available, using simple tokenization")
 
 
+# sklearn's default token pattern, used when no tokenizer is given
+_TOKEN_RE = re.compile(r"(?u)\b\w\w+\b")
+
+
+class FastTfidf:
+    """Lightweight TF-IDF for small per-file Japanese corpora.
+
+    Tokenizes each text once into a Counter, fills CSR arrays directly and
+    scales .data by the IDF in place. Mirrors TfidfVectorizer's defaults
+    (smooth_idf, l2 norm) and the vocabulary_/tokenizer attributes used by
+    TfidfSparseVectorizer, without the diagonal IDF matmul and its copy.
+    """
+
+    def __init__(
+        self,
+        tokenizer=None,
+        ngram_range: tuple = (1, 1),
+        max_features: int = None,
+        min_df=1,
+        max_df=1.0,
+        lowercase: bool = True,
+    ):
+        self.tokenizer = tokenizer
+        self.ngram_range = ngram_range
+        self.max_features = max_features
+        self.min_df = min_df
+        self.max_df = max_df
+        self.lowercase = lowercase
+        self.vocabulary_ = None
+        self.idf_ = None
+
+    def _analyze(self, text: str) -> List[str]:
+        """Tokenize text and expand it to the configured n-grams"""
+        if self.lowercase:
+            text = text.lower()
+        tokens = self.tokenizer(text) if self.tokenizer else _TOKEN_RE.findall(text)
+
+        min_n, max_n = self.ngram_range
+        terms = list(tokens) if min_n == 1 else []
+        for n in range(max(2, min_n), max_n + 1):
+            terms.extend(
+                " ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1)
+            )
+        return terms
+
+    @staticmethod
+    def _count_matrix(counts: List[Counter], vocabulary: Dict[str, int]):
+        """Build a CSR term-count matrix; terms outside vocabulary are dropped"""
+        indptr = [0]
+        indices = []
+        data = []
+        for counter in counts:
+            for term, count in counter.items():
+                col = vocabulary.get(term)
+                if col is not None:
+                    indices.append(col)
+                    data.append(count)
+            indptr.append(len(indices))
+
+        return sp.csr_matrix(
+            (
+                np.asarray(data, dtype=np.float64),
+                np.asarray(indices, dtype=np.int32),
+                np.asarray(indptr, dtype=np.int64),
+            ),
+            shape=(len(counts), len(vocabulary)),
+        )
+
+    def _apply_idf(self, matrix):
+        """Scale counts by IDF in place and L2-normalize rows"""
+        matrix.data *= np.take(self.idf_, matrix.indices)
+        return normalize(matrix, copy=False)
+
+    def fit_transform(self, texts: List[str]):
+        """Learn vocabulary and IDF from texts and return their TF-IDF matrix"""
+        counts = [Counter(self._analyze(text)) for text in texts]
+
+        vocabulary = {}
+        for counter in counts:
+            for term in counter:
+                vocabulary.setdefault(term, len(vocabulary))
+        matrix = self._count_matrix(counts, vocabulary)
+
+        # Document frequency: each term appears at most once per CSR row
+        num_docs = len(texts)
+        df = np.bincount(matrix.indices, minlength=len(vocabulary))
+        min_count = (
+            self.min_df if isinstance(self.min_df, int) else self.min_df * num_docs
+        )
+        max_count = (
+            self.max_df if isinstance(self.max_df, int) else self.max_df * num_docs
+        )
+        if max_count < min_count:
+            raise ValueError("max_df corresponds to < documents than min_df")
+
+        keep = (df >= min_count) & (df <= max_count)
+        if self.max_features is not None and keep.sum() > self.max_features:
+            # Keep the most frequent terms across the corpus
+            term_freq = np.bincount(
+                matrix.indices, weights=matrix.data, minlength=len(vocabulary)
+            )
+            # Ties go to the alphabetically first term. sklearn's _limit_features
+            # uses a non-stable argsort, so which tied terms survive the cut can
+            # differ from sklearn when max_features is set
+            terms = list(vocabulary)
+            candidates = np.array(
+                sorted(np.flatnonzero(keep).tolist(), key=terms.__getitem__)
+            )
+            top = candidates[
+                np.argsort(-term_freq[candidates], kind="stable")[: self.max_features]
+            ]
+            keep = np.zeros_like(keep)
+            keep[top] = True
+
+        kept = np.flatnonzero(keep)
+        if kept.size == 0:
+            raise ValueError(
+                "After pruning, no terms remain. Try a lower min_df or a higher max_df."
+            )
+        if kept.size < len(vocabulary):
+            terms = list(vocabulary)
+            vocabulary = {terms[col]: i for i, col in enumerate(kept.tolist())}
+            matrix = matrix[:, kept]
+            df = df[kept]
+
+        self.vocabulary_ = vocabulary
+        self.idf_ = np.log((1 + num_docs) / (1 + df)) + 1
+        return self._apply_idf(matrix)
+
+    def fit(self, texts: List[str]):
+        """Learn vocabulary and IDF from texts"""
+        self.fit_transform(texts)
+        return self
+
+    def transform(self, texts: List[str]):
+        """Return the TF-IDF matrix of texts using the fitted vocabulary"""
+        if self.vocabulary_ is None:
+            raise ValueError("FastTfidf is not fitted")
+        counts = [Counter(self._analyze(text)) for text in texts]
+        return self._apply_idf(self._count_matrix(counts, self.vocabulary_))
+
+
 class TfidfSparseVectorizer:
     """TF-IDF based sparse vector generator for Japanese text"""
 
@@ -46,6 +196,9 @@ class TfidfSparseVectorizer:
         min_df: int = 1,
         max_df: float = 0.95,
         use_mecab: bool = True,
+        use_hashing: bool = False,
+        n_features: int = 2**18,
+        use_fast_tfidf: bool = True,
     ):
         """
         Initialize TF-IDF sparse vectorizer
@@ -55,12 +208,19 @@ class TfidfSparseVectorizer:
             min_df: Minimum document frequency
             max_df: Maximum document frequency
             use_mecab: Whether to use MeCab for Japanese tokenization
+            use_hashing: Hash terms into n_features columns instead of
+                learning a vocabulary (new terms never require a refit)
+            n_features: Number of hashed feature columns
+            use_fast_tfidf: Use FastTfidf instead of sklearn's TfidfVectorizer
         """
         self.max_features = max_features
         self.ngram_range = ngram_range
         self.min_df = min_df
         self.max_df = max_df
         self.use_mecab = use_mecab and MECAB_AVAILABLE
+        self.use_hashing = use_hashing
+        self.n_features = n_features
+        self.use_fast_tfidf = use_fast_tfidf
 
         # Initialize MeCab
         self.mecab = None
@@ -101,20 +261,56 @@ class TfidfSparseVectorizer:
                 self.use_mecab = False
 
         # Initialize TF-IDF vectorizer
-        self.vectorizer = TfidfVectorizer(
-            max_features=self.max_features,
-            ngram_range=self.ngram_range,
-            min_df=self.min_df,
-            max_df=self.max_df,
-            tokenizer=self._tokenize_japanese if self.use_mecab else None,
-            lowercase=True,
-            stop_words=None,
-        )
+        tokenizer = self._tokenize_japanese if self.use_mecab else None
+        if self.use_hashing:
+            # Stateless term hashing; only the IDF weights are learned on fit
+            self.vectorizer = Pipeline(
+                [
+                    (
+                        "hashing",
+                        HashingVectorizer(
+                            n_features=self.n_features,
+                            ngram_range=self.ngram_range,
+                            tokenizer=tokenizer,
+                            lowercase=True,
+                            alternate_sign=False,
+                            norm=None,
+                        ),
+                    ),
+                    ("tfidf", TfidfTransformer()),
+                ]
+            )
+        elif self.use_fast_tfidf:
+            self.vectorizer = FastTfidf(
+                tokenizer=tokenizer,
+                ngram_range=self.ngram_range,
+                max_features=self.max_features,
+                min_df=self.min_df,
+                max_df=self.max_df,
+                lowercase=True,
+            )
+        else:
+            self.vectorizer = TfidfVectorizer(
+                max_features=self.max_features,
+                ngram_range=self.ngram_range,
+                min_df=self.min_df,
+                max_df=self.max_df,
+                tokenizer=tokenizer,
+                lowercase=True,
+                stop_words=None,
+            )
 
         self.is_fitted = False
         print("✅ TfidfSparseVectorizer initialized")
 
     # -------------------- Persistence helpers (pickling-safe) --------------------
+    @staticmethod
+    def _text_step(vectorizer):
+        """Return the estimator holding the tokenizer (pipeline or plain)"""
+        if isinstance(vectorizer, Pipeline):
+            return vectorizer.named_steps["hashing"]
+        return vectorizer
+
     def save_sklearn(self, path: str) -> None:
         """Save only the underlying scikit-learn TfidfVectorizer safely.
 
@@ -123,14 +319,14 @@ class TfidfSparseVectorizer:
         """
         if joblib is None:
             raise RuntimeError("joblib is required for saving. pip install joblib")
-        vec = self.vectorizer
+        text_step = self._text_step(self.vectorizer)
         # Temporarily drop tokenizer (bound method is not picklable)
-        original_tokenizer = getattr(vec, "tokenizer", None)
+        original_tokenizer = getattr(text_step, "tokenizer", None)
         try:
-            vec.tokenizer = None
-            joblib.dump(vec, path)
+            text_step.tokenizer = None
+            joblib.dump(self.vectorizer, path)
         finally:
-            vec.tokenizer = original_tokenizer
+            text_step.tokenizer = original_tokenizer
 
     @classmethod
     def load_sklearn(cls, path: str, **init_kwargs):
@@ -143,8 +339,11 @@ class TfidfSparseVectorizer:
         loaded_vec = joblib.load(path)
         inst = cls(**init_kwargs)
         inst.vectorizer = loaded_vec
+        inst.use_hashing = isinstance(loaded_vec, Pipeline)
         # Rebind tokenizer after loading
-        inst.vectorizer.tokenizer = inst._tokenize_japanese if inst.use_mecab else None
+        cls._text_step(loaded_vec).tokenizer = (
+            inst._tokenize_japanese if inst.use_mecab else None
+        )
         inst.is_fitted = True
         return inst
 
@@ -184,6 +383,28 @@ class TfidfSparseVectorizer:
             print(f"⚠️ Tokenization error: {e}")
             return text.split()
 
+    def fit(self, texts: List[str]) -> None:
+        """Learn vocabulary and IDF from texts without returning vectors"""
+        self.vectorizer.fit(texts)
+        self.is_fitted = True
+        print(f"✅ TF-IDF vectorizer fitted with {self.get_vocabulary_size()} features")
+
+    def fit_transform_matrix(self, texts: List[str]) -> sp.csr_matrix:
+        """Fit and transform texts, returning the CSR matrix (pymilvus accepts it as-is)"""
+        sparse_matrix = sp.csr_matrix(self.vectorizer.fit_transform(texts))
+        sparse_matrix.eliminate_zeros()
+        self.is_fitted = True
+        print(f"✅ TF-IDF vectorizer fitted with {self.get_vocabulary_size()} features")
+        return sparse_matrix
+
+    def transform_matrix(self, texts: List[str]) -> sp.csr_matrix:
+        """Transform texts with the fitted vectorizer, returning the CSR matrix"""
+        if not self.is_fitted:
+            raise ValueError("TF-IDF vectorizer must be fitted first")
+        sparse_matrix = sp.csr_matrix(self.vectorizer.transform(texts))
+        sparse_matrix.eliminate_zeros()
+        return sparse_matrix
+
     def fit_transform(self, texts: List[str]) -> List[Dict[int, float]]:
         """Fit and transform texts to sparse vectors"""
         try:
@@ -192,7 +413,7 @@ class TfidfSparseVectorizer:
             sparse_vectors = self._sparse_matrix_to_dict_list(sparse_matrix)
 
             print(
-                f"✅ TF-IDF vectorizer fitted with {len(self.vectorizer.vocabulary_)} features"
+                f"✅ TF-IDF vectorizer fitted with {self.get_vocabulary_size()} features"
             )
             print(f"✅ Generated {len(sparse_vectors)} sparse vectors")
 
@@ -217,24 +438,37 @@ class TfidfSparseVectorizer:
             print(f"❌ TF-IDF transform error: {e}")
             return []
 
-    def _sparse_matrix_to_dict_list(self, sparse_matrix) -> List[Dict[int, float]]:
-        """Convert scipy sparse matrix to list of dictionaries"""
-        sparse_vectors = []
+    def transform_query(self, query: str) -> Dict[int, float]:
+        """Transform a single query straight from its 1xV CSR row"""
+        if not self.is_fitted:
+            print("⚠️ TF-IDF vectorizer not fitted")
+            return {}
 
-        for i in range(sparse_matrix.shape[0]):
-            row = sparse_matrix.getrow(i)
-            sparse_dict = {}
+        row = self.vectorizer.transform([query])
+        # A single-row CSR holds exactly that row's indices/data
+        return dict(zip(row.indices.tolist(), row.data.tolist()))
 
-            for j in range(row.nnz):
-                col_idx = row.indices[j]
-                value = row.data[j]
-                if value > 0:
-                    sparse_dict[col_idx] = float(value)
+    def _sparse_matrix_to_dict_list(self, sparse_matrix) -> List[Dict[int, float]]:
+        """Convert scipy sparse matrix to list of dictionaries"""
+        sparse_matrix = sparse_matrix.tocsr()
+        # TF-IDF weights are non-negative; drop any explicit zeros up front
+        sparse_matrix.eliminate_zeros()
 
-            sparse_vectors.append(sparse_dict)
+        # One bulk tolist() per array yields native ints/floats; rows are
+        # then plain list slices bounded by indptr
+        indptr = sparse_matrix.indptr.tolist()
+        indices = sparse_matrix.indices.tolist()
+        data = sparse_matrix.data.tolist()
 
-        return sparse_vectors
+        return [
+            dict(zip(indices[start:end], data[start:end]))
+            for start, end in zip(indptr, indptr[1:])
+        ]
 
     def get_vocabulary_size(self) -> int:
         """Get vocabulary size"""
-        return len(self.vectorizer.vocabulary_) if self.is_fitted else 0
+        if not self.is_fitted:
+            return 0
+        if self.use_hashing:
+            return self.n_features
+        return len(self.vectorizer.vocabulary_)
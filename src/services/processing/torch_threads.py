@@ -0,0 +1,40 @@
+"""
+CPU thread pool configuration for the transformer forward pass
+"""
+
+import os
+from typing import Optional
+
+
+def configure_torch_threads(
+    num_threads: Optional[int] = None, interop_threads: int = 2
+) -> int:
+    """
+    Size torch's CPU thread pools for a batch process that owns the machine.
+
+    Call explicitly from batch entry points, not at import: in a multi-threaded
+    server (Flask/SocketIO) concurrent requests each encode, and one pool thread
+    per core per request oversubscribes the CPU. OMP_NUM_THREADS/MKL_NUM_THREADS
+    defaults only take effect if this runs before numpy/torch are imported.
+
+    Args:
+        num_threads: Intra-op threads (default: TORCH_NUM_THREADS, else cpu count)
+        interop_threads: Inter-op threads (ignored once torch has started work)
+
+    Returns:
+        Number of intra-op threads applied
+    """
+    if num_threads is None:
+        num_threads = int(os.getenv("TORCH_NUM_THREADS", os.cpu_count() or 4))
+    os.environ.setdefault("OMP_NUM_THREADS", str(num_threads))
+    os.environ.setdefault("MKL_NUM_THREADS", str(num_threads))
+
+    import torch
+
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(interop_threads)
+    except RuntimeError:
+        # Already set, or parallel work has already started
+        pass
+    return num_threads
@@ -2,27 +2,42 @@
 Vector generation utilities for conversation embeddings
 """
 
+import os
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from sentence_transformers import SentenceTransformer
 
 from models.conversation_chunk import ConversationChunk, EmbeddingResult
 
 # Note: JapaneseSparseVectorizer functionality moved to TfidfSparseVectorizer in conversation_vectorizer.py
 
+# Where exported/quantized ONNX models are cached between runs
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join("artifacts", "onnx"))
+# Dynamic INT8 quantization target (avx512_vnni, avx512, avx2, arm64)
+ONNX_QUANTIZATION = os.getenv("ONNX_QUANTIZATION", "avx512_vnni")
+# Dtype of returned dense embeddings; float16 halves insert/search payloads
+DENSE_EMBEDDING_DTYPE = np.dtype(os.getenv("DENSE_EMBEDDING_DTYPE", "float16"))
+
 
 class DenseVectorGenerator:
     """Dense vector generator using SentenceTransformer"""
 
     def __init__(
-        self, model_name: str = "sonoisa/sentence-bert-base-ja-mean-tokens-v2"
+        self,
+        model_name: str = "sonoisa/sentence-bert-base-ja-mean-tokens-v2",
+        use_onnx: Optional[bool] = None,
     ):
         """
         Initialize dense vector generator
         Args:
             model_name: SentenceTransformer model name
+            use_onnx: Encode with an INT8-quantized ONNX Runtime model
+                (defaults to the DENSE_USE_ONNX environment variable)
         """
         self.model_name = model_name
+        if use_onnx is None:
+            use_onnx = os.getenv("DENSE_USE_ONNX", "false").lower() == "true"
+        self.use_onnx = use_onnx
 
         # Pre-configure fugashi with unidic to avoid unidic_lite dependency
         try:
@@ -38,30 +53,60 @@ class DenseVectorGenerator:
             print(f"⚠️ fugashi pre-configuration failed: {fugashi_error}")
 
         # Temporarily disable any potential MeCab dependencies
-        import os
-
         os.environ["DISABLE_TOKENIZERS_PARALLELISM"] = "true"
 
         try:
-            self.model = SentenceTransformer(model_name)
+            if self.use_onnx:
+                self.model = self._load_onnx_model(model_name)
+            else:
+                self.model = SentenceTransformer(model_name)
             print(f"✅ Loaded SentenceTransformer model: {model_name}")
         except Exception as e:
             print(f"❌ Failed to load SentenceTransformer: {e}")
             # Fallback to a simpler model or raise the error
             raise e
 
+    @staticmethod
+    def _load_onnx_model(model_name: str) -> SentenceTransformer:
+        """
+        Load model on the ONNX Runtime backend with dynamic INT8 quantization.
+        The export and quantization run once; later loads reuse the cached files.
+        Args:
+            model_name: SentenceTransformer model name
+        Returns:
+            SentenceTransformer running on onnxruntime
+        """
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+
+        local_dir = os.path.join(ONNX_MODEL_DIR, model_name.replace("/", "__"))
+        quantized_file = f"model_qint8_{ONNX_QUANTIZATION}.onnx"
+
+        if not os.path.exists(os.path.join(local_dir, "onnx", quantized_file)):
+            print(f"🔧 Exporting {model_name} to ONNX ({ONNX_QUANTIZATION} INT8)...")
+            # Exports the FP32 graph when the hub repo has no ONNX file
+            model = SentenceTransformer(model_name, backend="onnx")
+            model.save(local_dir)
+            export_dynamic_quantized_onnx_model(model, ONNX_QUANTIZATION, local_dir)
+            print(f"💾 Saved quantized ONNX model to: {local_dir}")
+
+        return SentenceTransformer(
+            local_dir,
+            backend="onnx",
+            model_kwargs={"file_name": f"onnx/{quantized_file}"},
+        )
+
     def generate(self, texts: List[str]) -> np.ndarray:
         """
         Generate dense embeddings for texts
         Args:
             texts: List of text strings
         Returns:
-            Dense embeddings (L2 normalized)
+            Dense embeddings (L2 normalized, DENSE_EMBEDDING_DTYPE)
         """
-        embeddings = self.model.encode(texts)
-
-        # Apply L2 normalization for cosine similarity
-        embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+        # L2 normalization for cosine similarity, applied inside encode
+        embeddings = self.model.encode(
+            texts, convert_to_numpy=True, normalize_embeddings=True
+        ).astype(DENSE_EMBEDDING_DTYPE, copy=False)
 
         print(f"✅ Generated {len(texts)} dense embeddings")
         return embeddings
@@ -74,9 +119,9 @@ class DenseVectorGenerator:
         Returns:
             Query embedding (L2 normalized)
         """
-        embedding = self.model.encode([query])
-        embedding = embedding / np.linalg.norm(embedding, axis=1, keepdims=True)
-        return embedding
+        return self.model.encode(
+            [query], convert_to_numpy=True, normalize_embeddings=True
+        ).astype(DENSE_EMBEDDING_DTYPE, copy=False)
 
 
 class SparseVectorGenerator:
@@ -121,6 +166,7 @@ class HybridVectorGenerator:
         self,
         dense_model: str = "sonoisa/sentence-bert-base-ja-mean-tokens-v2",
         tokenizer=None,
+        use_onnx: Optional[bool] = None,
         **sparse_kwargs,
     ):
         """
@@ -128,9 +174,10 @@ class HybridVectorGenerator:
         Args:
             dense_model: SentenceTransformer model name
             tokenizer: Text tokenizer for preprocessing
+            use_onnx: Run the dense model on quantized ONNX Runtime
             **sparse_kwargs: Additional arguments for sparse vectorizer
         """
-        self.dense_generator = DenseVectorGenerator(dense_model)
+        self.dense_generator = DenseVectorGenerator(dense_model, use_onnx=use_onnx)
         self.sparse_generator = SparseVectorGenerator(**sparse_kwargs)
         self.tokenizer = tokenizer
         print("✅ Initialized hybrid vector generator")
@@ -160,12 +207,9 @@ class HybridVectorGenerator:
         # Generate dense embeddings
         dense_embeddings = self.dense_generator.generate(texts)
 
-        # Preprocess texts for sparse vectors (BM25 function will handle sparse generation)
-        # preprocessed_texts = self.preprocess_texts(texts)
-        preprocessed_texts = texts
-
-        # Generate sparse embeddings (BM25 function handles this automatically)
-        sparse_embeddings = self.sparse_generator.fit_and_generate(preprocessed_texts)
+        # Raw texts: the TF-IDF tokenizer (MeCab) segments them itself, so
+        # running preprocess_texts first would tokenize every text twice
+        sparse_embeddings = self.sparse_generator.fit_and_generate(texts)
 
         print(f"✅ Generated hybrid embeddings for {len(chunks)} chunks")
         return EmbeddingResult(dense_embeddings, sparse_embeddings)
@@ -183,7 +227,7 @@ class HybridVectorGenerator:
         # Generate dense query embedding
         dense_query = self.dense_generator.generate_query_embedding(query)
 
-        # Generate sparse query embedding for BM25 search
+        # Generate sparse query embedding from the raw query (no preprocess_texts)
         sparse_query = self.sparse_generator.generate_query_vector(query)
 
         return dense_query, sparse_query